@@ -1,8 +1,7 @@
 # app.py
-import pickle
-import json
 import streamlit as st
 from interface import show_ui
+from kraya import config, metrics, models
 
 st.set_page_config(
     page_title="Customer Support Assistant",
@@ -11,37 +10,22 @@ st.set_page_config(
 )
 
 # -----------------------------------------
-# Load Food Model + Vectorizer
+# Instrumentation exporters (started once per process, only if configured)
 # -----------------------------------------
-try:
-    food_model = pickle.load(open("food/food_weight_model_final.pkl", "rb"))
-    food_vectorizer = pickle.load(open("food/tfidf_vectorizer_final.pkl", "rb"))
-except:
-    st.warning("⚠️ Food model or vectorizer not loaded properly.")
-    food_model, food_vectorizer = None, None
+if config.METRICS and config.METRICS_PORT:
+    metrics.start_http_exporter(config.METRICS_PORT)
+if config.METRICS and config.METRICS_LOG_INTERVAL:
+    metrics.start_log_exporter(config.METRICS_LOG_INTERVAL)
 
 # -----------------------------------------
-# Load Fabric Model ONLY (no vectorizer needed)
+# Models are NOT loaded here. Each page loads what it needs from the
+# process-wide registry on first use (once per process, shared by every
+# session), and the rest is warmed up in the background after first paint.
+# Loaded artifacts are hot reloaded when their files (e.g. the KB) change.
 # -----------------------------------------
-
-try:
-    fabric_model = pickle.load(open("fabric/fabric_model.pkl", "rb"))
-except:
-    st.warning("⚠️ Fabric model not loaded properly.")
-    fabric_model = None
-
-
-# -----------------------------------------
-# Load Electronics JSON
-# -----------------------------------------
-try:
-    with open("electronics/electronics.json", "r") as f:
-        electronics_data = json.load(f)
-except:
-    st.warning("⚠️ Electronics JSON not found.")
-    electronics_data = None
+models.start_reload_watcher()
 
 # -----------------------------------------
-# Run UI (updated signature — no fabric_vectorizer)
+# Run UI (prediction logic lives in the headless kraya package)
 # -----------------------------------------
-show_ui(food_model, food_vectorizer, fabric_model, electronics_data)
+show_ui()
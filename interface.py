@@ -1,11 +1,14 @@
 # interface.py
 import streamlit as st
-from sentence_transformers import SentenceTransformer, util
-import numpy as np
+import contextlib
+import inspect
 import random
-import pandas as pd
+import threading
 import time
-from PIL import Image
+# Only light modules here: model code (numpy, sklearn, torch) is imported by
+# the page that needs it, so Home/About Us paint without loading any of it.
+from kraya import config, metrics, models
+from kraya.assets import hero_image
 # ---------------- STYLING ---------------- #
 def add_styles():
     st.markdown(
@@ -31,11 +34,90 @@ def add_styles():
         </style>
         """, unsafe_allow_html=True
     )
+# ---------------- RERUN SCOPING ---------------- #
+# Inputs live in st.form blocks, so editing them doesn't rerun the script;
+# only submitting does. Each analysis (form + result) is an st.fragment, so
+# a submit reruns just that fragment instead of app.py. KRAYA_FORMS=0 restores
+# plain widgets and full reruns for before/after comparisons.
+if config.FORMS:
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda fn: fn)
+else:
+    fragment = lambda fn: fn
+
+
+# st.form takes `border` from Streamlit 1.29 on
+_FORM_OPTIONS = {"border": False} if "border" in inspect.signature(st.form).parameters else {}
+
+
+def input_form(key):
+    return st.form(key, **_FORM_OPTIONS) if config.FORMS else contextlib.nullcontext()
+
+
+def submit_button(label):
+    return st.form_submit_button(label) if config.FORMS else st.button(label)
+
+
+_run_state = threading.local()
+
+
+@contextlib.contextmanager
+def rerun_scope(page, scope):
+    """Count one script run (full app or fragment) and its thread CPU time.
+
+    Streamlit executes each run on its own thread, so thread CPU time is the
+    server CPU of that run. Reruns and CPU accumulate per session until an
+    analysis completes (analysis_done); that run then reports how many
+    reruns and how much CPU the analysis cost. Nested scopes (a fragment
+    running inside a full app run) are not counted twice.
+    """
+    if getattr(_run_state, "active", False):
+        yield
+        return
+    _run_state.active = True
+    start = time.thread_time()
+    try:
+        yield
+    finally:
+        _run_state.active = False
+        cpu = time.thread_time() - start
+        state = st.session_state
+        state["kraya_reruns"] = state.get("kraya_reruns", 0) + 1
+        state["kraya_cpu"] = state.get("kraya_cpu", 0.0) + cpu
+        metrics.inc("reruns_total", page=page, scope=scope)
+        metrics.inc("rerun_cpu_seconds_total", cpu, page=page, scope=scope)
+        done = state.pop("kraya_analysis_done", None)
+        if done:
+            metrics.inc("analyses_total", page=done)
+            metrics.inc("analysis_reruns_total", state["kraya_reruns"], page=done)
+            metrics.observe("analysis_cpu_seconds", state["kraya_cpu"], page=done)
+            state["kraya_reruns"], state["kraya_cpu"] = 0, 0.0
+
+
+def analysis_done(page):
+    """Mark that this run completed an analysis on `page` (reported when the run ends)."""
+    st.session_state["kraya_analysis_done"] = page
+
+
+# ---------------- VERDICT ANIMATION ---------------- #
+def verdict_emoji_html(name, emoji_sequence, step_seconds=0.3):
+    """Emoji badge that cycles through `emoji_sequence` in the browser (CSS keyframes)."""
+    final = emoji_sequence[-1]
+    if not config.ANIMATIONS:
+        return final
+    n = len(emoji_sequence)
+    frames = " ".join(
+        f'{round(i * 100 / n, 2)}% {{ content: "{emoji}"; }}' for i, emoji in enumerate(emoji_sequence)
+    )
+    return (
+        f'<style>@keyframes {name} {{ {frames} 100% {{ content: "{final}"; }} }}'
+        f'.{name}::before {{ content: "{final}"; animation: {name} {n * step_seconds}s steps(1, end) 1 both; }}</style>'
+        f'<span class="{name}"></span>'
+    )
+
+
 # ---------------- FOOD PAGE ---------------- #
-def food_page(food_model, food_vectorizer):
-    import time
+def food_page():
     import streamlit as st
-    from PIL import Image
 
     # ================== CUSTOM CSS ==================
     st.markdown("""
@@ -107,8 +189,7 @@ def food_page(food_model, food_vectorizer):
 
     # ================== ADD IMAGE AFTER CONTENT ==================
     try:
-        img = Image.open("assets/food.png")  
-        st.image(img, use_column_width=True)
+        st.image(hero_image("food.png"), use_column_width=True)
         st.markdown('<p class="caption">Snack Detective at your service! 🕵️‍♂️🍩</p>', unsafe_allow_html=True)
     except FileNotFoundError:
         st.warning("⚠️ 'food.png' not found in assets folder!")
@@ -124,66 +205,9 @@ def food_page(food_model, food_vectorizer):
     </div>
     """, unsafe_allow_html=True)
 
-    # ================== USER INPUT ==================
+    # ================== USER INPUT + VERDICT ==================
     st.markdown('<p class="section-header">🕵️‍♂️ Snack Confessions Time!</p>', unsafe_allow_html=True)
-    ingredients = st.text_area("📝 Ingredients (comma-separated)", "sugar, salt, whole grain, vegetable oil")
-    label = st.selectbox("🎯 Your Goal", ["Weight Loss 🏃‍♀️", "Weight Gain 💪", "Balanced 😇"])
-    calories = st.number_input("🔥 Calories per serving", min_value=0)
-    protein = st.number_input("🍗 Protein (g)", min_value=0.0)
-    carbs = st.number_input("🥖 Carbs (g)", min_value=0.0)
-    fiber = st.number_input("🌿 Fiber (g)", min_value=0.0)
-    fat = st.number_input("🥓 Fat (g)", min_value=0.0)
-    sugar_val = st.number_input("🍬 Sugar (g)", min_value=0.0)
-
-    # ================== ANALYZE BUTTON ==================
-    if st.button("🔮 Foody Buddy, Analyze!"):
-        if not food_model or not food_vectorizer:
-            st.warning("⚠️ Oops! My buddy powers are napping… please load the model! 😴")
-            return
-
-        if not ingredients.strip():
-            st.warning("⚠️ I can’t read empty snacks! Enter some ingredients, buddy! 🤓")
-            return
-
-        # ===== ML Prediction: ingredients + numeric features =====
-        feature_text = f"{ingredients} {calories} {protein} {carbs} {fiber} {fat} {sugar_val}"
-        X = food_vectorizer.transform([feature_text])
-        pred_label = food_model.predict(X)[0]
-
-        # ===== Funny Buddy Messages =====
-        first_ing = ingredients.split(',')[0].strip()
-        if pred_label.lower() in label.lower():
-            result_color = "#d4edda"
-            badge_class = "badge-healthy"
-            emoji_sequence = ["🥳", "🎉", "🛒", "🍕"]
-            message = (
-                f"🎊 Woohoo! Looks like {first_ing} is giving a big high-five to your <b>{label}</b> goal! ✋😄<br>"
-                f"Your Foody Buddy approves this snack 100%! 🏆<br>"
-                f"Imagine confetti raining down and little cartoon snacks dancing around your plate 💃🍩🍪<br>"
-                f"Calories, protein, carbs? Nailed it! Even your macros are cheering! 🎯💪<br>"
-                f"Go grab it and enjoy like the snack superstar you are! 😋🤗"
-            )
-        else:
-            result_color = "#f8d7da"
-            badge_class = "badge-unhealthy"
-            emoji_sequence = ["😅", "🤔", "🙈", "🍩"]
-            message = (
-                f"🤔 Hmmm… {first_ing} might be a little tricky for your <b>{label}</b> goal.<br>"
-                f"But don’t worry! Your Foody Buddy isn’t here to judge, just to giggle along with you 😄<br>"
-                f"Maybe it’s slightly off-target, but hey — calories, sugar, and fun levels all balanced-ish! ⚖️🍬<br>"
-                f"Pro tip: sometimes a snack can be both naughty and nice — like a cookie wearing sunglasses 😎🍪<br>"
-                f"Eat if you must, laugh a lot, and tell me how it goes! 🎉🤗"
-            )
-
-        # ===== Display animated verdict =====
-        result_container = st.empty()
-        for emoji in emoji_sequence:
-            result_container.markdown(f"""
-            <div class="result-box" style="background:{result_color};">
-                <span class="{badge_class}">{emoji} Buddy Verdict!</span><br> {message}
-            </div>
-            """, unsafe_allow_html=True)
-            time.sleep(0.3)
+    food_analysis()
 
     # ================== PRO TIPS CARD ==================
     st.markdown('<p class="section-header">💡 Buddy Tips for Snacking Fun</p>', unsafe_allow_html=True)
@@ -200,8 +224,78 @@ def food_page(food_model, food_vectorizer):
     </div>
     """, unsafe_allow_html=True)
 
+
+@fragment
+def food_analysis():
+    from kraya.food import FoodRequest
+
+    with rerun_scope("food", "fragment"):
+        with input_form("food_form"):
+            ingredients = st.text_area("📝 Ingredients (comma-separated)", "sugar, salt, whole grain, vegetable oil")
+            label = st.selectbox("🎯 Your Goal", ["Weight Loss 🏃‍♀️", "Weight Gain 💪", "Balanced 😇"])
+            calories = st.number_input("🔥 Calories per serving", min_value=0)
+            protein = st.number_input("🍗 Protein (g)", min_value=0.0)
+            carbs = st.number_input("🥖 Carbs (g)", min_value=0.0)
+            fiber = st.number_input("🌿 Fiber (g)", min_value=0.0)
+            fat = st.number_input("🥓 Fat (g)", min_value=0.0)
+            sugar_val = st.number_input("🍬 Sugar (g)", min_value=0.0)
+
+            # ================== ANALYZE BUTTON ==================
+            submitted = submit_button("🔮 Foody Buddy, Analyze!")
+
+        if submitted:
+            # Fetched on every run: fragment reruns would otherwise keep the
+            # model of the last full run after a hot reload
+            food_classifier = load_model("food_classifier", FOOD_MODEL_WARNING)
+            if not food_classifier:
+                st.warning("⚠️ Oops! My buddy powers are napping… please load the model! 😴")
+                return
+
+            if not ingredients.strip():
+                st.warning("⚠️ I can’t read empty snacks! Enter some ingredients, buddy! 🤓")
+                return
+
+            # ===== ML Prediction: ingredients + numeric features =====
+            request = FoodRequest(ingredients, label, calories, protein, carbs, fiber, fat, sugar_val)
+            result = food_classifier.classify(request)
+            analysis_done("food")
+
+            # ===== Funny Buddy Messages =====
+            first_ing = request.first_ingredient
+            if result.matches_goal:
+                result_color = "#d4edda"
+                badge_class = "badge-healthy"
+                emoji_sequence = ["🥳", "🎉", "🛒", "🍕"]
+                message = (
+                    f"🎊 Woohoo! Looks like {first_ing} is giving a big high-five to your <b>{label}</b> goal! ✋😄<br>"
+                    f"Your Foody Buddy approves this snack 100%! 🏆<br>"
+                    f"Imagine confetti raining down and little cartoon snacks dancing around your plate 💃🍩🍪<br>"
+                    f"Calories, protein, carbs? Nailed it! Even your macros are cheering! 🎯💪<br>"
+                    f"Go grab it and enjoy like the snack superstar you are! 😋🤗"
+                )
+            else:
+                result_color = "#f8d7da"
+                badge_class = "badge-unhealthy"
+                emoji_sequence = ["😅", "🤔", "🙈", "🍩"]
+                message = (
+                    f"🤔 Hmmm… {first_ing} might be a little tricky for your <b>{label}</b> goal.<br>"
+                    f"But don’t worry! Your Foody Buddy isn’t here to judge, just to giggle along with you 😄<br>"
+                    f"Maybe it’s slightly off-target, but hey — calories, sugar, and fun levels all balanced-ish! ⚖️🍬<br>"
+                    f"Pro tip: sometimes a snack can be both naughty and nice — like a cookie wearing sunglasses 😎🍪<br>"
+                    f"Eat if you must, laugh a lot, and tell me how it goes! 🎉🤗"
+                )
+
+            # ===== Display animated verdict (animated client-side, no server sleep) =====
+            emoji = verdict_emoji_html(f"verdict-{badge_class}", emoji_sequence)
+            st.markdown(f"""
+            <div class="result-box" style="background:{result_color};">
+                <span class="{badge_class}">{emoji} Buddy Verdict!</span><br> {message}
+            </div>
+            """, unsafe_allow_html=True)
+
+
 # ---------------- FABRIC PAGE ---------------- #
-def fabric_page(fabric_model_dict):
+def fabric_page():
     st.title("🧵 Styling Buddy 🤗✨")
 
     # ================== BANNER ==================
@@ -240,116 +334,105 @@ def fabric_page(fabric_model_dict):
 
     # ================== IMAGE AFTER CONTENT ==================
     try:
-        img = Image.open("assets/fabric.png")
-        st.image(img, use_column_width=True)
+        st.image(hero_image("fabric.png"), use_column_width=True)
         st.markdown('<p style="text-align:center; font-style:italic; color:#555555;">Your Fashion Buddy at work! 👗✨</p>', unsafe_allow_html=True)
     except FileNotFoundError:
         st.warning("⚠️ 'fabric.png' not found in assets folder!")
 
-    # ================== USER INPUTS ==================
-    skin_tone = st.selectbox("🎨 Skin Tone", ["Fair", "Medium", "Dark"])
-    weather = st.selectbox("☀️ Weather Condition", ["Hot", "Cold", "Humid", "Dry"])
-    work_level = st.selectbox("💪 Work Level", ["High", "Medium", "Low"])
-    season = st.selectbox("🍂 Season", ["Summer", "Winter", "Spring", "Autumn"])
-
-    # Fabric mapping
-    fabric_map = {
-        "Breathable": ["Cotton", "Linen", "Rayon"],
-        "Synthetic": ["Polyester", "Nylon"],
-        "Warm": ["Wool", "Velvet"],
-        "LightSoft": ["Satin", "Silk", "Chiffon", "Georgette"],
-        "Denim": ["Denim"]
-    }
-
-    # Flatten list of fabrics for dropdown
-    all_fabrics = sorted([f for fabrics in fabric_map.values() for f in fabrics])
-    user_fabric = st.selectbox("👗 Fabric You Want to Wear", all_fabrics)
-
-    # ================== ENCODINGS ==================
-    encode_skin = {"Fair": "Fair", "Medium": "Medium", "Dark": "Dark"}
-    encode_weather = {"Hot": "Hot", "Cold": "Cold", "Humid": "Humid", "Dry": "Dry"}
-    encode_work = {"High": "High", "Medium": "Medium", "Low": "Low"}
-    encode_season = {"Summer": "Summer", "Winter": "Winter", "Spring": "Spring", "Autumn": "Autumn"}
-
-    # ================== BUTTON ==================
-    if st.button("🎯 Check Fabric Recommendation"):
-        if fabric_model_dict is None:
-            st.error("⚠️ My fabric senses are offline… load the model first 😢")
-            return
+    fabric_analysis()
 
-        try:
-            # Prepare input for prediction
-            X_input = pd.DataFrame([[
-                encode_season[season],
-                encode_skin[skin_tone],
-                encode_weather[weather],
-                encode_work[work_level]
-            ]], columns=["Season", "SkinTone", "Weather", "WorkLevel"])
-
-            X_encoded = fabric_model_dict["encoder"].transform(X_input)
-            pred_encoded = fabric_model_dict["model"].predict(X_encoded)[0]
-            pred_group = fabric_model_dict["label"].inverse_transform([pred_encoded])[0]
-
-            # Get actual fabrics in the predicted group
-            fabrics_in_group = ", ".join(fabric_map[pred_group])
-
-            # ======= FUNNY BUDDY RESULT =======
-            result_style = """
-                padding:25px;
-                border-radius:15px;
-                background: linear-gradient(135deg, #ffe0b2, #ffcc80);
-                box-shadow: 2px 2px 12px rgba(0,0,0,0.08);
-                font-size:16px;
-                line-height:1.6;
-                color:#e65100;
-                margin-top:15px;
-            """
 
-            if user_fabric in fabric_map[pred_group]:
-                message = (
-                    f"🎉 Hurray! Your choice of '<i>{user_fabric}</i>' is FABULOUS for your selections! 😎💫<br>"
-                    f"Buddy prediction: <b>{pred_group}</b> – meaning all these fab fabrics are safe too: <b>{fabrics_in_group}</b> 🌟<br>"
-                    f"Looks like your fashion sense is already on point! 🕺💃<br>"
-                    f"Go ahead, flaunt that fabric, twirl a bit, and feel like a superstar! ✨👗👕"
-                )
-            else:
-                message = (
-                    f"🤔 Hmm… you chose '<i>{user_fabric}</i>', but your Fabric Buddy thinks <b>{pred_group}</b> fabrics would be more comfy & stylish! 🧵✨<br>"
-                    f"Options you can rock: <b>{fabrics_in_group}</b> 🌟<br>"
-                    f"Don’t worry, buddy loves your choice too, but consider trying one of these next time for max wow factor! 😄<br>"
-                    f"Remember: confidence + fabric = legendary combo! 💃🕺"
-                )
+@fragment
+def fabric_analysis():
+    from kraya.fabric import FabricRequest, FABRIC_MAP, ALL_FABRICS, SKIN_TONES, WEATHERS, WORK_LEVELS, SEASONS
 
-            st.markdown(f'<div style="{result_style}">{message}</div>', unsafe_allow_html=True)
+    with rerun_scope("fabric", "fragment"):
+        with input_form("fabric_form"):
+            # ================== USER INPUTS ==================
+            skin_tone = st.selectbox("🎨 Skin Tone", SKIN_TONES)
+            weather = st.selectbox("☀️ Weather Condition", WEATHERS)
+            work_level = st.selectbox("💪 Work Level", WORK_LEVELS)
+            season = st.selectbox("🍂 Season", SEASONS)
 
-            # ======= FABRIC BUDDY TIPS =======
-            tips_style = """
-                background-color:#f3e5f5;
-                border-left:6px solid #ab47bc;
-                padding:15px;
-                border-radius:15px;
-                margin-top:10px;
-                line-height:1.6;
-            """
-            st.markdown(f"""
-            <div style="{tips_style}">
-                💡 <b>Fabric Buddy Tips:</b><br>
-                - Pick fabrics suited for your weather: breathable for hot 🌞, warm for cold ❄️.<br>
-                - Fabrics + skin tone = instant style points 🎨💯<br>
-                - LightSoft fabrics = silky clouds on your skin ☁️✨<br>
-                - Denim & Synthetic = durable, casual vibes 😎<br>
-                - Confidence is the best accessory – twirl like a superstar! 💃🕺<br>
-                - Try new fabrics, but always let comfort be your buddy! 😄
-            </div>
-            """, unsafe_allow_html=True)
+            # Flatten list of fabrics for dropdown
+            user_fabric = st.selectbox("👗 Fabric You Want to Wear", ALL_FABRICS)
+
+            # ================== BUTTON ==================
+            submitted = submit_button("🎯 Check Fabric Recommendation")
+
+        if submitted:
+            fabric_recommender = load_model("fabric_recommender", FABRIC_MODEL_WARNING)
+            if fabric_recommender is None:
+                st.error("⚠️ My fabric senses are offline… load the model first 😢")
+                return
 
-        except Exception as e:
-            st.error(f"⚠️ Oopsie! Something went wrong during prediction: {e} 😅")
+            try:
+                result = fabric_recommender.recommend(
+                    FabricRequest(season, skin_tone, weather, work_level, user_fabric)
+                )
+                pred_group = result.group
+
+                # Get actual fabrics in the predicted group
+                fabrics_in_group = ", ".join(FABRIC_MAP[pred_group])
+
+                # ======= FUNNY BUDDY RESULT =======
+                result_style = """
+                    padding:25px;
+                    border-radius:15px;
+                    background: linear-gradient(135deg, #ffe0b2, #ffcc80);
+                    box-shadow: 2px 2px 12px rgba(0,0,0,0.08);
+                    font-size:16px;
+                    line-height:1.6;
+                    color:#e65100;
+                    margin-top:15px;
+                """
+
+                if result.fabric_ok:
+                    message = (
+                        f"🎉 Hurray! Your choice of '<i>{user_fabric}</i>' is FABULOUS for your selections! 😎💫<br>"
+                        f"Buddy prediction: <b>{pred_group}</b> – meaning all these fab fabrics are safe too: <b>{fabrics_in_group}</b> 🌟<br>"
+                        f"Looks like your fashion sense is already on point! 🕺💃<br>"
+                        f"Go ahead, flaunt that fabric, twirl a bit, and feel like a superstar! ✨👗👕"
+                    )
+                else:
+                    message = (
+                        f"🤔 Hmm… you chose '<i>{user_fabric}</i>', but your Fabric Buddy thinks <b>{pred_group}</b> fabrics would be more comfy & stylish! 🧵✨<br>"
+                        f"Options you can rock: <b>{fabrics_in_group}</b> 🌟<br>"
+                        f"Don’t worry, buddy loves your choice too, but consider trying one of these next time for max wow factor! 😄<br>"
+                        f"Remember: confidence + fabric = legendary combo! 💃🕺"
+                    )
+
+                st.markdown(f'<div style="{result_style}">{message}</div>', unsafe_allow_html=True)
+                analysis_done("fabric")
+
+                # ======= FABRIC BUDDY TIPS =======
+                tips_style = """
+                    background-color:#f3e5f5;
+                    border-left:6px solid #ab47bc;
+                    padding:15px;
+                    border-radius:15px;
+                    margin-top:10px;
+                    line-height:1.6;
+                """
+                st.markdown(f"""
+                <div style="{tips_style}">
+                    💡 <b>Fabric Buddy Tips:</b><br>
+                    - Pick fabrics suited for your weather: breathable for hot 🌞, warm for cold ❄️.<br>
+                    - Fabrics + skin tone = instant style points 🎨💯<br>
+                    - LightSoft fabrics = silky clouds on your skin ☁️✨<br>
+                    - Denim & Synthetic = durable, casual vibes 😎<br>
+                    - Confidence is the best accessory – twirl like a superstar! 💃🕺<br>
+                    - Try new fabrics, but always let comfort be your buddy! 😄
+                </div>
+                """, unsafe_allow_html=True)
+
+            except Exception as e:
+                st.error(f"⚠️ Oopsie! Something went wrong during prediction: {e} 😅")
 
 
 # ---------------- ELECTRONICS PAGE ---------------- #
 
-def electronics_page(electronics_data, embed_model):
+def electronics_page():
     st.title("📱 Electronics Fixing Buddy 🤖✨")
 
     # ================== BANNER ==================
@@ -395,97 +478,101 @@ So spill the beans, the weirder your description, the more fun our buddy adventu
 
     # ================== IMAGE AFTER INTRO ==================
     try:
-        img = Image.open("assets/electronic.png") 
-        st.image(img, use_column_width=True)
+        st.image(hero_image("electronic.png"), use_column_width=True)
         st.markdown('<p style="text-align:center; font-style:italic; color:#555555;">Your Tech Buddy in action! ⚡🤖</p>', unsafe_allow_html=True)
     except FileNotFoundError:
         st.warning("⚠️ 'electronics.png' not found in assets folder!")
 
-    # ================== DEVICE SELECTION ==================
-    devices = ["Smartphone 📱", "Laptop 💻", "TV 📺", "Washing Machine 🧺", "Refrigerator ❄️"]
-    device = st.selectbox("🔧 Choose your device", devices)
-
-    # ================== USER INPUT ==================
-    user_input = st.text_area("✍️ Describe your issue (don’t hold back!)", height=120)
-
-    # ================== GET SUPPORT ==================
-    if st.button("🛠️ Get Support"):
-        if not user_input.strip():
-            st.warning("⚠️ Come on, buddy needs some clues! Describe the problem 😅")
-            return
-
-        if not electronics_data:
-            st.warning("⚠️ Whoops! I don’t have any electronics data loaded 😬")
-            return
-
-        user_emb = embed_model.encode(user_input, convert_to_tensor=True)
-
-        best_match = None
-        max_score = -1
-
-        for item in electronics_data:
-            clean_device = device.split()[0].strip()
-            if item['device'].lower() != clean_device.lower():
-                continue
-
-            texts_to_compare = [item['problem']] + item.get('example_queries', [])
-            for text in texts_to_compare:
-                desc_emb = embed_model.encode(text, convert_to_tensor=True)
-                score = util.pytorch_cos_sim(user_emb, desc_emb).item()
-                if score > max_score:
-                    max_score = score
-                    best_match = item
-
-        # ================== SOLUTION CARD ==================
-        solution_card_style = """
-            padding:25px; 
-            border-radius:15px; 
-            background:linear-gradient(135deg, #fce4ec, #f8bbd0); 
-            box-shadow: 2px 2px 15px rgba(0,0,0,0.08);
-            font-size:16px;
-            line-height:1.6;
-            color:#37474f;
-            margin-top:15px;
-        """
+    electronics_analysis()
+
+
+@fragment
+def electronics_analysis():
+    from kraya.electronics import SupportRequest
+
+    with rerun_scope("electronics", "fragment"):
+        with input_form("electronics_form"):
+            # ================== DEVICE SELECTION ==================
+            devices = ["Smartphone 📱", "Laptop 💻", "TV 📺", "Washing Machine 🧺", "Refrigerator ❄️"]
+            device = st.selectbox("🔧 Choose your device", devices)
+
+            # ================== USER INPUT ==================
+            user_input = st.text_area("✍️ Describe your issue (don’t hold back!)", height=120)
+
+            # ================== GET SUPPORT ==================
+            submitted = submit_button("🛠️ Get Support")
+
+        if submitted:
+            if not user_input.strip():
+                st.warning("⚠️ Come on, buddy needs some clues! Describe the problem 😅")
+                return
 
-        solution_html = f'<div style="{solution_card_style}">'
-
-        buddy_headers_good = [
-            "😎 Buddy Tip Incoming:", 
-            "🛠️ Genius Hack:", 
-            "💡 Quick Fix Alert:", 
-            "🤔 Try This Clever Move:"
-        ]
-        buddy_headers_fallback = [
-            "😬 Hmm… Not sure:", 
-            "🤖 Brainstorming Mode:", 
-            "⚡ Device Acting Up:", 
-            "📞 Call in Reinforcements:"
-        ]
-
-        if best_match and max_score > 0.6:
-            solution_html += f'<h3 style="color:#d81b60;">{random.choice(buddy_headers_good)}</h3>'
-            steps = best_match["solution"].split(", ")
-            for i, step in enumerate(steps, start=1):
-                solution_html += f'<p style="margin:5px 0;">🔹 <b>Step {i}:</b> {step} ✅</p>'
-
-            if 'tips' in best_match:
-                solution_html += f'<p style="margin-top:10px; padding:10px; background:#fff3e0; border-radius:10px;">💡 <b>Extra Buddy Tips:</b> {best_match["tips"]}</p>'
+            electronics_retriever = load_model("electronics_retriever", ELECTRONICS_MODEL_WARNING)
+            if electronics_retriever is None:
+                return
+
+            if not electronics_retriever.index.items:
+                st.warning("⚠️ Whoops! I don’t have any electronics data loaded 😬")
+                return
+
+            # One query encode + one matrix-vector product against the prebuilt index
+            result = electronics_retriever.support(SupportRequest(device, user_input))
+            best_match, alternatives = result.item, result.alternatives
+            analysis_done("electronics")
+
+            # ================== SOLUTION CARD ==================
+            solution_card_style = """
+                padding:25px; 
+                border-radius:15px; 
+                background:linear-gradient(135deg, #fce4ec, #f8bbd0); 
+                box-shadow: 2px 2px 15px rgba(0,0,0,0.08);
+                font-size:16px;
+                line-height:1.6;
+                color:#37474f;
+                margin-top:15px;
+            """
+
+            solution_html = f'<div style="{solution_card_style}">'
+
+            buddy_headers_good = [
+                "😎 Buddy Tip Incoming:", 
+                "🛠️ Genius Hack:", 
+                "💡 Quick Fix Alert:", 
+                "🤔 Try This Clever Move:"
+            ]
+            buddy_headers_fallback = [
+                "😬 Hmm… Not sure:", 
+                "🤖 Brainstorming Mode:", 
+                "⚡ Device Acting Up:", 
+                "📞 Call in Reinforcements:"
+            ]
+
+            if result.confident:
+                solution_html += f'<h3 style="color:#d81b60;">{random.choice(buddy_headers_good)}</h3>'
+                for i, step in enumerate(result.steps, start=1):
+                    solution_html += f'<p style="margin:5px 0;">🔹 <b>Step {i}:</b> {step} ✅</p>'
+
+                if 'tips' in best_match:
+                    solution_html += f'<p style="margin-top:10px; padding:10px; background:#fff3e0; border-radius:10px;">💡 <b>Extra Buddy Tips:</b> {best_match["tips"]}</p>'
             
-            solution_html += f'<p style="margin-top:10px; font-style:italic; color:#6a1b9a;">🎉 Remember: Even if you break it more, at least you had fun! 😜</p>'
-        else:
-            solution_html += f'<h3 style="color:#d32f2f;">{random.choice(buddy_headers_fallback)}</h3>'
-            solution_html += "<p>I couldn’t find an exact fix 😅, but try some buddy-approved tricks:</p>"
-            solution_html += "<ul style='margin-left:20px;'>"
-            solution_html += "<li>🔌 Double-check your cables and connections</li>"
-            solution_html += "<li>🔄 Restart your device – it loves a nap 😴</li>"
-            solution_html += "<li>💾 Update the software if possible – gadgets like to stay trendy 💅</li>"
-            solution_html += "<li>📞 Call official support if all else fails – don’t worry, they speak human too 😎</li>"
-            solution_html += "</ul>"
-            solution_html += f'<p style="margin-top:10px; font-style:italic; color:#6a1b9a;">🎉 Your buddy is cheering you on! You got this! 💪🤖</p>'
-
-        solution_html += "</div>"
-        st.markdown(solution_html, unsafe_allow_html=True)
+                if alternatives:
+                    others = "".join(f"<li>{alt['problem']}</li>" for alt in alternatives)
+                    solution_html += f'<p style="margin-top:10px;">🔁 <b>Not quite it? It might also be:</b></p><ul style="margin-left:20px;">{others}</ul>'
+
+                solution_html += f'<p style="margin-top:10px; font-style:italic; color:#6a1b9a;">🎉 Remember: Even if you break it more, at least you had fun! 😜</p>'
+            else:
+                solution_html += f'<h3 style="color:#d32f2f;">{random.choice(buddy_headers_fallback)}</h3>'
+                solution_html += "<p>I couldn’t find an exact fix 😅, but try some buddy-approved tricks:</p>"
+                solution_html += "<ul style='margin-left:20px;'>"
+                solution_html += "<li>🔌 Double-check your cables and connections</li>"
+                solution_html += "<li>🔄 Restart your device – it loves a nap 😴</li>"
+                solution_html += "<li>💾 Update the software if possible – gadgets like to stay trendy 💅</li>"
+                solution_html += "<li>📞 Call official support if all else fails – don’t worry, they speak human too 😎</li>"
+                solution_html += "</ul>"
+                solution_html += f'<p style="margin-top:10px; font-style:italic; color:#6a1b9a;">🎉 Your buddy is cheering you on! You got this! 💪🤖</p>'
+
+            solution_html += "</div>"
+            st.markdown(solution_html, unsafe_allow_html=True)
 
 
 def about_us_page():
@@ -510,8 +597,7 @@ def about_us_page():
 
     # ---------------- IMAGE + CAPTION ---------------- #
     try:
-        img_about = Image.open("assets/about_us.png")
-        st.image(img_about, width=500)
+        st.image(hero_image("about_us.png", 500), width=500)
         st.markdown('<p style="text-align:center; font-style:italic; color:#555555;">Kraya: Always ready to assist, laugh, and guide! 🤖💜</p>', unsafe_allow_html=True)
     except FileNotFoundError:
         st.warning("⚠️ 'about_us.png' not found in the assets folder!")
@@ -593,7 +679,34 @@ def about_us_page():
     """, unsafe_allow_html=True)
 
 # ---------------- MAIN UI ---------------- #
-def show_ui(food_model, food_vectorizer, fabric_model, electronics_data):
+# Sidebar label -> short page name used in metrics
+PAGES = {
+    "🏠 Home": "home",
+    "🍎 Food": "food",
+    "📱 Electronics": "electronics",
+    "🧵 Fabric": "fabric",
+    "ℹ️ About Us": "about",
+}
+
+
+FOOD_MODEL_WARNING = "⚠️ Food model or vectorizer not loaded properly!"
+FABRIC_MODEL_WARNING = "⚠️ Fabric model not loaded properly!"
+ELECTRONICS_MODEL_WARNING = "⚠️ Electronics data not loaded properly!"
+
+
+def load_model(name, message):
+    """Model from the shared registry, loaded on first use; None (with a warning) on failure."""
+    try:
+        if models.registry.is_loaded(name):
+            return models.get(name)
+        with st.spinner("🤖 Waking up your buddy…"):
+            return models.get(name)
+    except Exception as e:
+        st.warning(f"{message} {e}")
+        return None
+
+
+def show_ui():
 
     # Apply global styles
     add_styles()
@@ -602,9 +715,20 @@ def show_ui(food_model, food_vectorizer, fabric_model, electronics_data):
     st.sidebar.title("🛍️ Lifestyle Helper")
     page = st.sidebar.radio(
         "Navigate",
-        ["🏠 Home", "🍎 Food", "📱 Electronics", "🧵 Fabric", "ℹ️ About Us"]
+        list(PAGES)
     )
 
+    page_name = PAGES[page]
+    metrics.inc("page_views_total", page=page_name)
+    with rerun_scope(page_name, "app"), metrics.span("render", page=page_name):
+        render_page(page)
+
+    # After the first paint, load the remaining page models in the background
+    if config.WARMUP:
+        models.start_warmup()
+
+
+def render_page(page):
     # ---------------- HOME PAGE ---------------- #
     if page == "🏠 Home":
         st.title("🏠 Welcome to ✨ Kraya ✨")
@@ -621,9 +745,8 @@ def show_ui(food_model, food_vectorizer, fabric_model, electronics_data):
 
         # First image (after description)
         try:
-            img_desc = Image.open("assets/home1.png")
             st.image(
-                img_desc,
+                hero_image("home1.png", 500),
                 caption="Kraya: Your quirky, smart, life-saving buddy 😎",
                 width=500
             )
@@ -643,9 +766,8 @@ def show_ui(food_model, food_vectorizer, fabric_model, electronics_data):
 
         # Second image (original place)
         try:
-            img_banner = Image.open("assets/home2.png")
             st.image(
-                img_banner,
+                hero_image("home2.png"),
                 caption="Kraya in action: Helping you shop smart and slay! 💃",
                 use_column_width=True
             )
@@ -678,25 +800,23 @@ def show_ui(food_model, food_vectorizer, fabric_model, electronics_data):
 
     # ---------------- FOOD PAGE ---------------- #
     elif page == "🍎 Food":
-        if not food_model or not food_vectorizer:
-            st.warning("⚠️ Food model or vectorizer not loaded properly!")
-        else:
-            food_page(food_model, food_vectorizer)
+        food_classifier = load_model("food_classifier", FOOD_MODEL_WARNING)
+        if food_classifier:
+            food_page()
 
     # ---------------- FABRIC PAGE ---------------- #
     elif page == "🧵 Fabric":
-        if not fabric_model:
-            st.warning("⚠️ Fabric model not loaded properly!")
-        else:
-            fabric_page(fabric_model)
+        fabric_recommender = load_model("fabric_recommender", FABRIC_MODEL_WARNING)
+        if fabric_recommender:
+            fabric_page()
 
     # ---------------- ELECTRONICS PAGE ---------------- #
     elif page == "📱 Electronics":
-        if not electronics_data:
-            st.warning("⚠️ Electronics data not loaded properly!")
-        else:
-            embed_model = SentenceTransformer('all-MiniLM-L6-v2')
-            electronics_page(electronics_data, embed_model)
+        # Shared across sessions: loaded on first visit, not per rerun. The
+        # analysis fragments fetch the models again themselves (hot reload)
+        electronics_retriever = load_model("electronics_retriever", ELECTRONICS_MODEL_WARNING)
+        if electronics_retriever:
+            electronics_page()
 
     # ---------------- ABOUT US PAGE ---------------- #
     elif page == "ℹ️ About Us":
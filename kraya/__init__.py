@@ -0,0 +1,2 @@
+# kraya/__init__.py
+# Shared, Streamlit-free building blocks used by app.py and interface.py.
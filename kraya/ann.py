@@ -0,0 +1,192 @@
+# kraya/ann.py
+# Pluggable nearest-neighbour backends for the electronics matcher.
+#
+# All backends index a matrix of L2-normalized rows and answer
+# `search(query, n) -> (rows, scores)` with the n best rows by cosine
+# similarity, best first. `ExactBackend` is brute force; `IVFBackend` is a
+# pure-NumPy inverted-file index (spherical k-means lists, `n_probe` lists
+# scanned per query); `HNSWBackend` wraps the optional local `hnswlib`
+# package. Everything runs offline.
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # optional dependency
+    hnswlib = None
+
+
+def _top_n(scores, n):
+    n = min(n, scores.size)
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    if n < scores.size:
+        top = np.argpartition(-scores, n - 1)[:n]
+    else:
+        top = np.arange(scores.size)
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+# ---------------- EXACT ---------------- #
+class ExactBackend:
+    name = "exact"
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def search(self, query, n):
+        scores = np.asarray(self.vectors) @ query
+        top = _top_n(scores, n)
+        return top, scores[top]
+
+
+# ---------------- IVF ---------------- #
+class IVFBackend:
+    """Inverted-file index: rows are bucketed by their nearest k-means centroid."""
+    name = "ivf"
+
+    def __init__(self, vectors, n_lists=None, n_probe=8, iterations=10, seed=0, sample_size=20000):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n = vectors.shape[0]
+        self.n_lists = max(1, min(n_lists or int(np.sqrt(n)), n, sample_size))
+        self.n_probe = n_probe
+        self.centroids = self._train(vectors, iterations, seed, sample_size)
+
+        assign = np.argmax(vectors @ self.centroids.T, axis=1) if n else np.empty(0, dtype=np.intp)
+        order = np.argsort(assign, kind="stable")
+        # List-ordered copy so each probed list is one contiguous block
+        self.rows = order.astype(np.intp)
+        self.list_vectors = vectors[order]
+        counts = np.bincount(assign, minlength=self.n_lists)
+        self.offsets = np.r_[0, np.cumsum(counts)]
+
+    def _train(self, vectors, iterations, seed, sample_size):
+        rng = np.random.default_rng(seed)
+        n = vectors.shape[0]
+        if n == 0:
+            return np.zeros((1, vectors.shape[1]), dtype=np.float32)
+        sample = vectors[rng.choice(n, size=min(n, sample_size), replace=False)]
+        centroids = sample[rng.choice(sample.shape[0], size=self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Re-seed empty lists from random sample rows
+            sums[empty] = sample[rng.choice(sample.shape[0], size=int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+        return centroids
+
+    def search(self, query, n, n_probe=None):
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        lists = _top_n(self.centroids @ query, n_probe)
+        blocks = [np.arange(self.offsets[l], self.offsets[l + 1]) for l in lists]
+        positions = np.concatenate(blocks) if blocks else np.empty(0, dtype=np.intp)
+        scores = self.list_vectors[positions] @ query
+        top = _top_n(scores, n)
+        return self.rows[positions[top]], scores[top]
+
+
+# ---------------- HNSW (optional) ---------------- #
+class HNSWBackend:
+    name = "hnsw"
+
+    def __init__(self, vectors, M=16, ef_construction=200, ef_search=64, threads=1):
+        if hnswlib is None:
+            raise ImportError("HNSWBackend needs the optional 'hnswlib' package")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.size = vectors.shape[0]
+        self.index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        self.index.init_index(max_elements=max(self.size, 1), M=M, ef_construction=ef_construction)
+        if self.size:
+            self.index.add_items(vectors, np.arange(self.size), num_threads=threads)
+        # Set once: the index is shared by the server's search threads, and
+        # knn_query already searches with max(ef, k) for larger k
+        self.index.set_ef(ef_search)
+
+    def search(self, query, n):
+        n = min(n, self.size)
+        if n <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        labels, distances = self.index.knn_query(query, k=n)
+        # hnswlib "ip" distance is 1 - inner product
+        return labels[0].astype(np.intp), (1.0 - distances[0]).astype(np.float32)
+
+
+BACKENDS = {
+    "exact": ExactBackend,
+    "ivf": IVFBackend,
+    "hnsw": HNSWBackend,
+}
+
+
+def make_backend(name, vectors, **options):
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown search backend '{name}' (choose from {sorted(BACKENDS)})") from None
+    return cls(vectors, **options)
+
+
+# ---------------- RECALL CHECK ---------------- #
+def recall_at_k(vectors, backend, queries, k=10):
+    """Mean fraction of the exact top-k rows that `backend` also returns."""
+    exact = ExactBackend(vectors)
+    hits = 0
+    total = 0
+    for q in np.asarray(queries, dtype=np.float32):
+        truth, _ = exact.search(q, k)
+        found, _ = backend.search(q, k)
+        hits += len(set(truth.tolist()) & set(found.tolist()))
+        total += len(truth)
+    return hits / total if total else 1.0
+
+
+def _synthetic_vectors(n, dim, clusters, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, size=n)] + 0.35 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Recall/latency check of an ANN backend against exact search.")
+    parser.add_argument("--backend", default="ivf", choices=sorted(BACKENDS))
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--n-probe", type=int, default=8)
+    parser.add_argument("--ef-search", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    vectors = _synthetic_vectors(args.rows, args.dim, args.clusters)
+    queries = _synthetic_vectors(args.queries, args.dim, args.clusters, seed=1)
+    options = {}
+    if args.backend == "ivf":
+        options = {"n_lists": args.n_lists, "n_probe": args.n_probe}
+    elif args.backend == "hnsw":
+        options = {"ef_search": args.ef_search}
+
+    start = time.perf_counter()
+    backend = make_backend(args.backend, vectors, **options)
+    build_s = time.perf_counter() - start
+
+    for name, b in (("exact", ExactBackend(vectors)), (args.backend, backend)):
+        start = time.perf_counter()
+        for q in queries:
+            b.search(q, args.k)
+        per_query_ms = (time.perf_counter() - start) / len(queries) * 1000
+        print(f"{name:>6}: {per_query_ms:.3f} ms/query")
+    print(f"build: {build_s:.2f}s  recall@{args.k}: {recall_at_k(vectors, backend, queries, args.k):.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
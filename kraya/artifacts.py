@@ -0,0 +1,304 @@
+# kraya/artifacts.py
+# Compact, pickle-free model artifacts.
+#
+# An artifact is a directory with a manifest.json (format, kind, version,
+# parameters, and a sha256 + dtype + shape for every file) and plain .npy
+# arrays. Arrays are loaded with allow_pickle=False – memory-mapped where
+# that helps – so loading never executes code from the file, and worker
+# processes share the same page-cache pages.
+#
+#   food    vocabulary (sorted terms + column index), idf, coef, intercept,
+#           optional scaler mean/scale; vectorizer settings in the manifest
+#   fabric  the precomputed FabricTable: categories, groups, proba; it must
+#           cover every value the UI and API accept, as there is no model
+#           to fall back to
+#
+#   python -m kraya.artifacts convert-food --out food/artifact
+#   python -m kraya.artifacts build-fabric --out fabric/artifact
+#   python -m kraya.artifacts verify food/artifact
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+FORMAT = "kraya-artifact"
+ARTIFACT_VERSION = 1
+MANIFEST = "manifest.json"
+
+FOOD_ARTIFACT_DIR = "food/artifact"
+FABRIC_ARTIFACT_DIR = "fabric/artifact"
+FABRIC_CSV = "fabric/fabric_recommendation_dataset.csv"
+
+# TfidfVectorizer settings carried in the manifest
+VECTORIZER_PARAMS = ("lowercase", "token_pattern", "ngram_range", "stop_words", "strip_accents",
+                     "analyzer", "binary", "norm", "use_idf", "smooth_idf", "sublinear_tf")
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ---------------- WRITE ---------------- #
+def write_artifact(out_dir, kind, arrays, params):
+    """Write arrays + manifest into `out_dir`, replacing it atomically."""
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".artifact-", dir=parent)
+    try:
+        files = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            if array.dtype == object:
+                raise ArtifactError(f"'{name}' has dtype object; artifacts must not need pickle")
+            path = os.path.join(tmp, name + ".npy")
+            np.save(path, array, allow_pickle=False)
+            files[name] = {
+                "path": name + ".npy",
+                "sha256": _sha256(path),
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+            }
+        manifest = {
+            "format": FORMAT,
+            "kind": kind,
+            "version": ARTIFACT_VERSION,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "params": params,
+            "files": files,
+        }
+        with open(os.path.join(tmp, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.exists(out_dir):
+            old = out_dir.rstrip("/") + ".old"
+            shutil.rmtree(old, ignore_errors=True)
+            os.replace(out_dir, old)
+            os.replace(tmp, out_dir)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(tmp, out_dir)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return manifest
+
+
+# ---------------- READ ---------------- #
+def read_artifact(path, kind, verify=True, mmap=True):
+    """Return (params, arrays) of an artifact; raises ArtifactError on any mismatch."""
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Cannot read manifest of {path}: {e}") from e
+    if manifest.get("format") != FORMAT or manifest.get("kind") != kind:
+        raise ArtifactError(f"{path} is not a {kind} artifact")
+    if manifest.get("version") != ARTIFACT_VERSION:
+        raise ArtifactError(f"{path} has version {manifest.get('version')}, expected {ARTIFACT_VERSION}")
+
+    arrays = {}
+    for name, meta in manifest["files"].items():
+        file_path = os.path.join(path, meta["path"])
+        if verify and _sha256(file_path) != meta["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {file_path}")
+        try:
+            array = np.load(file_path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        except (OSError, ValueError) as e:
+            raise ArtifactError(f"Cannot load {file_path}: {e}") from e
+        if array.dtype.str != meta["dtype"] or list(array.shape) != meta["shape"]:
+            raise ArtifactError(f"{file_path} does not match its manifest entry")
+        arrays[name] = array
+    return manifest["params"], arrays
+
+
+def fingerprint(path):
+    """Short identity of an artifact (hash of its manifest), e.g. for cache keys."""
+    return _sha256(os.path.join(path, MANIFEST))[:16]
+
+
+# ---------------- FOOD ---------------- #
+def food_arrays(model, vectorizer, scaler=None):
+    terms = sorted(vectorizer.vocabulary_)
+    arrays = {
+        "vocab_terms": np.array(terms, dtype=str),
+        "vocab_index": np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int32),
+        "idf": np.asarray(vectorizer.idf_, dtype=np.float64),
+        "coef": np.asarray(model.coef_, dtype=np.float64),
+        "intercept": np.asarray(model.intercept_, dtype=np.float64),
+    }
+    if scaler is not None:
+        arrays["scaler_mean"] = np.asarray(scaler.mean_, dtype=np.float64)
+        arrays["scaler_scale"] = np.asarray(scaler.scale_, dtype=np.float64)
+    params = {name: getattr(vectorizer, name) for name in VECTORIZER_PARAMS}
+    if params["stop_words"] is not None and not isinstance(params["stop_words"], str):
+        params["stop_words"] = sorted(params["stop_words"])
+    params["ngram_range"] = list(params["ngram_range"])
+    params["classes"] = [str(c) for c in model.classes_]
+    # predict_proba is softmax or one-vs-rest depending on these
+    params["solver"] = getattr(model, "solver", "lbfgs")
+    params["multi_class"] = getattr(model, "multi_class", "auto")
+    params["structured"] = scaler is not None
+    return arrays, params
+
+
+def save_food_artifact(out_dir, model, vectorizer, scaler=None):
+    arrays, params = food_arrays(model, vectorizer, scaler)
+    return write_artifact(out_dir, "food", arrays, params)
+
+
+def load_food_artifact(path, verify=True):
+    """FoodClassifier rebuilt from arrays (no unpickling).
+
+    Fitted state is set through public attributes only, and the arrays stay
+    memory-mapped (np.asarray, not np.array) so workers share their pages.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+    from kraya.food import FoodClassifier
+
+    params, arrays = read_artifact(path, "food", verify=verify)
+    vocabulary = dict(zip(arrays["vocab_terms"].tolist(), arrays["vocab_index"].tolist()))
+    vec_params = {name: params[name] for name in VECTORIZER_PARAMS}
+    vec_params["ngram_range"] = tuple(vec_params["ngram_range"])
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary, **vec_params)
+    # The public idf_ setter also checks it against the fixed vocabulary
+    vectorizer.idf_ = np.asarray(arrays["idf"])
+
+    model = LogisticRegression(solver=params.get("solver", "lbfgs"))
+    if params.get("multi_class") not in (None, "auto", "deprecated"):
+        model.multi_class = params["multi_class"]
+    model.classes_ = np.array(params["classes"], dtype=object)
+    model.coef_ = np.asarray(arrays["coef"])
+    model.intercept_ = np.asarray(arrays["intercept"])
+    model.n_features_in_ = model.coef_.shape[1]
+
+    scaler = None
+    if params.get("structured"):
+        scaler = StandardScaler()
+        scaler.mean_ = np.asarray(arrays["scaler_mean"])
+        scaler.scale_ = np.asarray(arrays["scaler_scale"])
+        scaler.n_features_in_ = scaler.mean_.shape[0]
+    return FoodClassifier(model, vectorizer, scaler)
+
+
+# ---------------- FABRIC ---------------- #
+def save_fabric_artifact(out_dir, table):
+    if not table.covers():
+        raise ArtifactError("Fabric table does not cover every UI input value")
+    arrays = {"proba": np.asarray(table.proba, dtype=np.float32)}
+    params = {"categories": table.categories, "groups": table.groups}
+    return write_artifact(out_dir, "fabric", arrays, params)
+
+
+def load_fabric_artifact(path, verify=True):
+    """FabricRecommender answering purely from the stored table."""
+    from kraya.fabric import FabricRecommender, FabricTable
+
+    params, arrays = read_artifact(path, "fabric", verify=verify)
+    table = FabricTable(params["categories"], params["groups"], arrays["proba"])
+    if not table.covers():
+        raise ArtifactError(f"{path} does not cover every UI input value; rebuild it with "
+                            f"'python -m kraya.artifacts build-fabric'")
+    return FabricRecommender(table=table)
+
+
+def train_fabric_model(csv_path=FABRIC_CSV, seed=42):
+    """Retrain the fabric model exactly as the notebook does; returns ({model, encoder, label}, accuracy)."""
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder, OneHotEncoder
+    from kraya.fabric import FABRIC_MAP, FEATURE_COLUMNS
+
+    df = pd.read_csv(csv_path)
+    group_of = {fabric: group for group, fabrics in FABRIC_MAP.items() for fabric in fabrics}
+    df["FabricGroup"] = df["Fabric"].map(group_of)
+
+    encoder = OneHotEncoder(handle_unknown="ignore")
+    X = encoder.fit_transform(df[FEATURE_COLUMNS])
+    label = LabelEncoder()
+    y = label.fit_transform(df["FabricGroup"])
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed)
+    model = RandomForestClassifier(n_estimators=300, max_depth=10, random_state=seed)
+    model.fit(X_train, y_train)
+    accuracy = accuracy_score(y_test, model.predict(X_test))
+    return {"model": model, "encoder": encoder, "label": label}, accuracy
+
+
+# ---------------- CLI ---------------- #
+def main(argv=None):
+    import argparse
+    import pickle
+
+    parser = argparse.ArgumentParser(description="Build, convert and verify Kraya model artifacts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    food = sub.add_parser("convert-food", help="convert the food pickles into an artifact")
+    food.add_argument("--bundle", default="food/food_model.pkl",
+                      help="{model, vectorizer, scaler} pickle (used when it exists)")
+    food.add_argument("--model", default="food/food_weight_model_final.pkl")
+    food.add_argument("--vectorizer", default="food/tfidf_vectorizer_final.pkl")
+    food.add_argument("--out", default=FOOD_ARTIFACT_DIR)
+
+    fabric = sub.add_parser("convert-fabric", help="convert fabric_model.pkl into an artifact")
+    fabric.add_argument("--pickle", default="fabric/fabric_model.pkl")
+    fabric.add_argument("--out", default=FABRIC_ARTIFACT_DIR)
+
+    build = sub.add_parser("build-fabric", help="retrain from the CSV and write the fabric artifact")
+    build.add_argument("--csv", default=FABRIC_CSV)
+    build.add_argument("--out", default=FABRIC_ARTIFACT_DIR)
+    build.add_argument("--pickle", help="also write a {model, encoder, label} pickle here")
+
+    verify = sub.add_parser("verify", help="check manifest and checksums")
+    verify.add_argument("path")
+    args = parser.parse_args(argv)
+
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    if args.command == "convert-food":
+        if os.path.exists(args.bundle):
+            bundle = load(args.bundle)
+            manifest = save_food_artifact(args.out, bundle["model"], bundle["vectorizer"], bundle.get("scaler"))
+        else:
+            manifest = save_food_artifact(args.out, load(args.model), load(args.vectorizer))
+    elif args.command == "convert-fabric":
+        from kraya.fabric import FabricRecommender
+        manifest = save_fabric_artifact(args.out, FabricRecommender(load(args.pickle)).table)
+    elif args.command == "build-fabric":
+        from kraya.fabric import FabricTable
+        model_dict, accuracy = train_fabric_model(args.csv)
+        print(f"Fabric model test accuracy: {accuracy:.3f}")
+        if args.pickle:
+            with open(args.pickle, "wb") as f:
+                pickle.dump(model_dict, f)
+        table = FabricTable.build(model_dict["encoder"], model_dict["model"], model_dict["label"])
+        manifest = save_fabric_artifact(args.out, table)
+    else:
+        with open(os.path.join(args.path, MANIFEST)) as f:
+            kind = json.load(f).get("kind")
+        read_artifact(args.path, kind, verify=True)
+        print(f"✅ {args.path} ({kind}) is valid.")
+        return 0
+
+    size = sum(os.path.getsize(os.path.join(args.out, meta["path"])) for meta in manifest["files"].values())
+    print(f"Wrote {manifest['kind']} artifact to {args.out} ({len(manifest['files'])} arrays, {size / 1e3:.1f} kB).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
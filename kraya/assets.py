@@ -0,0 +1,135 @@
+# kraya/assets.py
+# Cached, downscaled renditions of the page hero images in assets/.
+#
+# The source PNGs are 1.4-3.3 MB at 1024-1536 px. Each image is re-encoded
+# once per (source content hash, target width) as WebP (JPEG if Pillow lacks
+# WebP), written under assets/.renditions/, and the encoded bytes are kept in
+# memory for the life of the process, so reruns and sessions never decode
+# the PNGs again.
+import hashlib
+import io
+import os
+import threading
+
+from kraya import metrics
+
+ASSETS_DIR = "assets"
+RENDITIONS_DIR = os.path.join(ASSETS_DIR, ".renditions")
+COLUMN_WIDTH = 1400  # widest main column in the "wide" layout
+PIXEL_RATIO = 2      # fixed-width images are rendered sharp on HiDPI screens
+QUALITY = 80
+
+_memory = {}
+_hashes = {}
+_lock = threading.Lock()
+
+
+def target_width(display_width=None):
+    return COLUMN_WIDTH if display_width is None else display_width * PIXEL_RATIO
+
+
+def _source_hash(path):
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    digest = _hashes.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()[:16]
+        _hashes[key] = digest
+    return digest
+
+
+def _format():
+    from PIL import features
+    return ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+
+def _encode(path, width):
+    from PIL import Image
+
+    fmt, _ = _format()
+    with Image.open(path) as img:
+        img.load()
+        if img.width > width:
+            height = round(img.height * width / img.width)
+            img = img.resize((width, height), Image.LANCZOS)
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        elif img.mode == "P":
+            img = img.convert("RGBA")
+        buf = io.BytesIO()
+        if fmt == "WEBP":
+            img.save(buf, format=fmt, quality=QUALITY, method=6)
+        else:
+            img.save(buf, format=fmt, quality=QUALITY, optimize=True, progressive=True)
+        return buf.getvalue()
+
+
+def rendition(name, width):
+    """Encoded bytes of assets/<name> scaled to at most `width` pixels wide."""
+    path = os.path.join(ASSETS_DIR, name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    digest = _source_hash(path)
+    key = (name, digest, width)
+    data = _memory.get(key)
+    if data is not None:
+        metrics.inc("cache_hits_total", cache="assets")
+        return data
+    metrics.inc("cache_misses_total", cache="assets")
+    with _lock:
+        data = _memory.get(key)
+        if data is not None:
+            return data
+        stem = os.path.splitext(name)[0]
+        cached = os.path.join(RENDITIONS_DIR, f"{stem}-{digest}-{width}.{_format()[1]}")
+        try:
+            with open(cached, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = _encode(path, width)
+            try:
+                os.makedirs(RENDITIONS_DIR, exist_ok=True)
+                tmp = cached + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, cached)
+            except OSError:
+                pass  # read-only deploys still get the in-memory copy
+        # Drop renditions of older versions of this source
+        for old in [k for k in _memory if k[0] == name and k[1] != digest]:
+            del _memory[old]
+        _memory[key] = data
+        return data
+
+
+def hero_image(name, display_width=None):
+    """Rendition for st.image: column width when `display_width` is None, else e.g. width=500."""
+    return rendition(name, target_width(display_width))
+
+
+# ---------------- PREBUILD ---------------- #
+# (image, display width) pairs used by interface.py
+PAGE_IMAGES = [
+    ("home1.png", 500),
+    ("home2.png", None),
+    ("food.png", None),
+    ("fabric.png", None),
+    ("electronic.png", None),
+    ("about_us.png", 500),
+]
+
+
+def main(argv=None):
+    for name, display_width in PAGE_IMAGES:
+        data = hero_image(name, display_width)
+        source = os.path.getsize(os.path.join(ASSETS_DIR, name))
+        print(f"{name:>15}: {source / 1e6:.2f} MB -> {len(data) / 1e3:.0f} kB @ {target_width(display_width)}px")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
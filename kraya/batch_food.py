@@ -0,0 +1,133 @@
+# kraya/batch_food.py
+# Offline batch scoring of food products from CSV.
+#
+# Streams a CSV shaped like food/food_dataset_realistic.csv (ingredients +
+# calories/protein/carbs/fiber/fat/sugar) in chunks, builds the same features
+# as the Food page, runs one sparse transform + predict_proba per chunk
+# (optionally across a process pool) and appends results to the output CSV as
+# soon as each chunk is done, so memory stays flat regardless of file size.
+#
+#   python -m kraya.batch_food food/food_dataset_realistic.csv scored.csv --chunk-size 5000 --workers 4
+import csv
+import itertools
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from kraya.food import GOALS, FoodRequest, goal_matches
+
+_classifier = None
+
+
+def _number(value, integer=False):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = 0.0
+    # The Food page submits calories as an int and macros as floats
+    return int(number) if integer else number
+
+
+def row_request(row):
+    return FoodRequest(
+        ingredients=row.get("ingredients") or "",
+        calories=_number(row.get("calories"), integer=True),
+        protein=_number(row.get("protein")),
+        carbs=_number(row.get("carbs")),
+        fiber=_number(row.get("fiber")),
+        fat=_number(row.get("fat")),
+        sugar=_number(row.get("sugar")),
+    )
+
+
+def _goal_column(goal):
+    return "matches_" + goal.lower().replace(" ", "_")
+
+
+# ---------------- SCORING ---------------- #
+def _init_worker():
+    global _classifier
+    from kraya import models
+    _classifier = models.get("food_classifier")
+
+
+def score_chunk(rows, classifier=None):
+    """Score one chunk of CSV rows; returns output rows with label, probabilities and goal matches."""
+    classifier = classifier or _classifier
+    labels, proba, classes = classifier.predict_proba([row_request(row) for row in rows])
+    out = []
+    for row, label, p in zip(rows, labels, proba):
+        scored = dict(row)
+        scored["predicted_label"] = label
+        for cls, value in zip(classes, p):
+            scored["proba_" + cls.lower().replace(" ", "_")] = round(float(value), 6)
+        for goal in GOALS:
+            scored[_goal_column(goal)] = goal_matches(label, goal)
+        out.append(scored)
+    return out
+
+
+def _chunks(reader, chunk_size):
+    while True:
+        chunk = list(itertools.islice(reader, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_csv(in_path, out_path, chunk_size=5000, workers=1, classifier=None):
+    """Stream `in_path` to `out_path`; returns (rows_scored, seconds)."""
+    start = time.perf_counter()
+    total = 0
+    with open(in_path, newline="", encoding="utf-8") as fin, \
+            open(out_path, "w", newline="", encoding="utf-8") as fout:
+        reader = csv.DictReader(fin)
+        writer = None
+
+        def write(scored):
+            nonlocal writer, total
+            if writer is None:
+                writer = csv.DictWriter(fout, fieldnames=list(scored[0].keys()))
+                writer.writeheader()
+            writer.writerows(scored)
+            fout.flush()
+            total += len(scored)
+
+        if workers <= 1:
+            if classifier is None:
+                _init_worker()
+                classifier = _classifier
+            for chunk in _chunks(reader, chunk_size):
+                write(score_chunk(chunk, classifier))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                # Bounded window of in-flight chunks keeps memory flat and output ordered
+                pending = deque()
+                for chunk in _chunks(reader, chunk_size):
+                    pending.append(pool.submit(score_chunk, chunk))
+                    if len(pending) >= workers * 2:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    return total, time.perf_counter() - start
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch-score food products from CSV.")
+    parser.add_argument("input", help="CSV with ingredients + calories/protein/carbs/fiber/fat/sugar")
+    parser.add_argument("output", help="CSV to write (input columns + predictions)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1, help="process pool size (1 = in-process)")
+    args = parser.parse_args(argv)
+
+    rows, seconds = score_csv(args.input, args.output, args.chunk_size, args.workers)
+    rate = rows / seconds if seconds > 0 else float("inf")
+    print(f"Scored {rows} rows in {seconds:.2f}s ({rate:.0f} rows/s) -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
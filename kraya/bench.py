@@ -0,0 +1,491 @@
+# kraya/bench.py
+# Benchmark harness for the three inference paths, with regression gates.
+#
+# Each path (food, fabric, electronics) runs in its own fresh process so cold
+# start (imports + model load) and peak RSS are measured in isolation. Warm
+# latency is measured request-by-request (p50/p95/p99), throughput with
+# batched calls. Workloads are drawn from the bundled datasets, optionally
+# replaced by a recorded JSONL workload ({"path": "food", "request": {...}}
+# per line). Electronics additionally scores synthetic KBs scaled to the
+# requested row counts.
+#
+#   python -m kraya.bench                       # run, compare with benchmarks/baseline.json
+#   python -m kraya.bench --save-baseline       # record a new baseline
+#   python -m kraya.bench --no-compare          # report only, no gate
+#   python -m kraya.bench --kb-rows 1000,100000 --tolerance 0.25
+#   python -m kraya.bench --serving 1,2,4       # pre-forked server: throughput + per-worker RSS/PSS
+#
+# Exits with status 1 when any metric regresses beyond the tolerance, or when
+# there is no baseline to compare with (unless --no-compare).
+import json
+import os
+import subprocess
+import sys
+import time
+
+from kraya.stats import peak_rss_bytes, summarize
+
+PATHS = ("food", "fabric", "electronics")
+ARTIFACTS = {
+    "food": "food_classifier",
+    "fabric": "fabric_recommender",
+    "electronics": "electronics_retriever",
+}
+FOOD_CSV = "food/food_dataset_realistic.csv"
+FABRIC_CSV = "fabric/fabric_recommendation_dataset.csv"
+ELECTRONICS_JSON = "electronics/electronics.json"
+BASELINE_PATH = "benchmarks/baseline.json"
+
+# Metrics gated against the baseline; "higher" ones regress when they drop
+LOWER_IS_BETTER = ("cold_start_s", "warm.p50_ms", "warm.p95_ms", "warm.p99_ms", "peak_rss_mb")
+HIGHER_IS_BETTER = ("throughput_rps",)
+
+
+# ---------------- WORKLOADS ---------------- #
+def food_workload(limit=None):
+    import csv
+    from kraya.batch_food import row_request
+
+    with open(FOOD_CSV, newline="", encoding="utf-8") as f:
+        requests = []
+        for row in csv.DictReader(f):
+            req = row_request(row)
+            req.goal = row.get("label") or req.goal
+            requests.append(req)
+            if limit and len(requests) >= limit:
+                break
+    return requests
+
+
+def fabric_workload(limit=None):
+    import csv
+    from kraya.fabric import FabricRequest
+
+    with open(FABRIC_CSV, newline="", encoding="utf-8") as f:
+        requests = [
+            FabricRequest(row["Season"], row["SkinTone"], row["Weather"], row["WorkLevel"], row["Fabric"])
+            for row in csv.DictReader(f)
+        ]
+    return requests[:limit] if limit else requests
+
+
+def query_variants(text):
+    """A few realistic rewrites of a KB query (casing, filler, truncation)."""
+    words = text.rstrip(".?!").split()
+    return [
+        text,
+        text.lower(),
+        "help, " + text.lower(),
+        " ".join(words[: max(3, len(words) - 2)]),
+    ]
+
+
+def electronics_workload(limit=None):
+    from kraya.electronics import SupportRequest
+
+    with open(ELECTRONICS_JSON, "r") as f:
+        items = json.load(f)
+    requests = []
+    for item in items:
+        for text in [item["problem"]] + item.get("example_queries", []):
+            for variant in query_variants(text):
+                requests.append(SupportRequest(item["device"], variant))
+    return requests[:limit] if limit else requests
+
+
+def recorded_workload(path, which):
+    from kraya.server import parse_fabric, parse_food, parse_support
+
+    parse = {"food": parse_food, "fabric": parse_fabric, "electronics": parse_support}[which]
+    requests = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("path") == which:
+                    requests.append(parse(record["request"]))
+    return requests
+
+
+WORKLOADS = {"food": food_workload, "fabric": fabric_workload, "electronics": electronics_workload}
+
+
+# ---------------- SYNTHETIC KB SCALER ---------------- #
+def synthetic_index(index, rows, noise=0.05, seed=0):
+    """ElectronicsIndex with `rows` rows made by replicating + jittering the real KB vectors."""
+    import numpy as np
+    from kraya.electronics_index import ElectronicsIndex, device_key
+
+    rng = np.random.default_rng(seed)
+    base = index.dense()
+    n_rows, n_items = base.shape[0], len(index.items)
+    pick = np.arange(rows) % n_rows
+    replica = np.arange(rows) // n_rows
+    vectors = base[pick] + noise * rng.standard_normal((rows, base.shape[1])).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    item_ids = replica * n_items + index.row_item[pick]
+    n_replicas = int(replica.max()) + 1 if rows else 0
+    items = [dict(item, problem=f"{item['problem']} #{r}") for r in range(n_replicas) for item in index.items]
+    # Keep rows grouped by device, then by item, as ElectronicsIndex expects
+    devices = sorted({device_key(item["device"]) for item in index.items})
+    device_code = {d: i for i, d in enumerate(devices)}
+    codes = np.array([device_code[device_key(index.items[i]["device"])] for i in index.row_item[pick]])
+    order = np.lexsort((item_ids, codes))
+    return ElectronicsIndex(items, vectors[order], item_ids[order]).quantized(index.precision)
+
+
+# ---------------- MEASUREMENT (worker process) ---------------- #
+def _call(path, engine):
+    if path == "food":
+        return engine.classify_batch
+    if path == "fabric":
+        return engine.recommend_batch
+    return engine.support_batch
+
+
+def _uncached(path, engine):
+    """Copy of `engine` with its result caches off, so warm numbers measure the model."""
+    if path == "electronics":
+        from kraya.electronics import ElectronicsRetriever
+        return ElectronicsRetriever(engine.index, engine.embed_model, engine.threshold,
+                                    cache_size=0, semantic_distance=0, lexical=engine.lexical is not None,
+                                    lexical_threshold=engine.lexical_threshold, shortlist=engine.shortlist)
+    if path == "food":
+        from kraya.food import FoodClassifier
+        return FoodClassifier(engine.model, engine.vectorizer, engine.scaler,
+                              fast=engine.scorer is not None, cache_size=0)
+    return engine
+
+
+def _cache_counts(path, engine):
+    """(hits, misses) of the engine's result cache; None for paths without one."""
+    if path not in ("food", "electronics"):
+        return None
+    stats = engine.cache_stats()
+    stats = stats["exact"] if path == "electronics" else stats
+    return stats["hits"], stats["misses"]
+
+
+def measure_cached(path, engine, requests, iterations):
+    """Latency of repeat requests through the caching engine, and the hit rate they got."""
+    call = _call(path, engine)
+    repeated = requests[:iterations]
+    for req in repeated:
+        call([req])
+    before = _cache_counts(path, engine)
+    latencies = []
+    for i in range(iterations):
+        t = time.perf_counter()
+        call([repeated[i % len(repeated)]])
+        latencies.append(time.perf_counter() - t)
+    hits, misses = (a - b for a, b in zip(_cache_counts(path, engine), before))
+    return dict(summarize(latencies), hit_rate=round(hits / (hits + misses), 4) if hits + misses else None)
+
+
+def measure_path(path, iterations=500, batch_size=64, kb_rows=(), workload=None):
+    started = time.perf_counter()
+    from kraya import models
+    cached_engine = models.get(ARTIFACTS[path])
+    cold_start = time.perf_counter() - started
+
+    requests = recorded_workload(workload, path) if workload else WORKLOADS[path]()
+    if not requests:
+        raise ValueError(f"Empty workload for {path}")
+    engine = _uncached(path, cached_engine)
+    call = _call(path, engine)
+    for req in requests[:10]:
+        call([req])
+
+    latencies = []
+    for i in range(iterations):
+        t = time.perf_counter()
+        call([requests[i % len(requests)]])
+        latencies.append(time.perf_counter() - t)
+
+    done = 0
+    t = time.perf_counter()
+    while done < iterations:
+        batch = [requests[(done + j) % len(requests)] for j in range(batch_size)]
+        call(batch)
+        done += batch_size
+    throughput = done / (time.perf_counter() - t)
+
+    result = {
+        "requests": len(requests),
+        "cold_start_s": round(cold_start, 4),
+        "warm": summarize(latencies),
+        "throughput_rps": round(throughput, 1),
+    }
+    if path == "electronics":
+        from kraya import config
+        from kraya.encoder import parameter_bytes
+        weights = parameter_bytes(engine.embed_model)
+        result.update(
+            encoder=config.EMBED_RUNTIME,
+            vectors=engine.index.precision,
+            index_kb=round(engine.index.nbytes / 2**10, 1),
+            encoder_weights_mb=round(weights / 2**20, 1) if weights else None,
+        )
+    if _cache_counts(path, cached_engine) is not None:
+        result["cached"] = measure_cached(path, cached_engine, requests, iterations)
+    if path == "electronics":
+        result["sources"] = engine.source_stats()
+        result["lexical"] = measure_lexical(engine, requests, iterations)
+    if path == "electronics" and kb_rows:
+        result["kb_scaling"] = measure_kb_scaling(engine, requests, kb_rows, iterations)
+    result["peak_rss_mb"] = round(peak_rss_bytes() / 2**20, 1)
+    return result
+
+
+def measure_lexical(retriever, requests, iterations):
+    """Uncached latency per result source with the lexical first stage on, and the no-encode share."""
+    from kraya.electronics import ElectronicsRetriever
+
+    hybrid = ElectronicsRetriever(retriever.index, retriever.embed_model, retriever.threshold,
+                                  cache_size=0, semantic_distance=0, lexical=True)
+    by_source = {}
+    for i in range(iterations):
+        t = time.perf_counter()
+        result = hybrid.support(requests[i % len(requests)])
+        by_source.setdefault(result.source, []).append(time.perf_counter() - t)
+    report = {source: dict(summarize(lat), share=round(len(lat) / iterations, 4))
+              for source, lat in sorted(by_source.items())}
+    report["no_encode_share"] = hybrid.source_stats()["no_encode_share"]
+    return report
+
+
+def measure_kb_scaling(retriever, requests, kb_rows, iterations):
+    vectors = retriever.encode([r.query for r in requests])
+    scaling = {}
+    for rows in kb_rows:
+        t = time.perf_counter()
+        index = synthetic_index(retriever.index, rows)
+        build = time.perf_counter() - t
+        if retriever.index.backend_name != "exact":
+            index.set_backend(retriever.index.backend_name, min_ann_rows=retriever.index.min_ann_rows,
+                              fetch_factor=retriever.index.fetch_factor, **retriever.index.backend_options)
+        latencies = []
+        for i in range(iterations):
+            req = requests[i % len(requests)]
+            t = time.perf_counter()
+            index.top_k(vectors[i % len(requests)], req.device, req.k)
+            latencies.append(time.perf_counter() - t)
+        scaling[str(rows)] = dict(summarize(latencies), build_s=round(build, 3))
+    return scaling
+
+
+# ---------------- PRE-FORKED SERVER SCALING ---------------- #
+ROUTES = {"food": "/food/classify", "fabric": "/fabric/recommend", "electronics": "/electronics/support"}
+
+
+def route_payloads(limit=200):
+    """[(route, JSON payload)] interleaving the three bundled workloads."""
+    from dataclasses import asdict
+
+    per_path = {path: [asdict(r) for r in WORKLOADS[path](limit)] for path in PATHS}
+    mixed = []
+    for i in range(max(len(v) for v in per_path.values())):
+        for path, payloads in per_path.items():
+            if i < len(payloads):
+                mixed.append((ROUTES[path], payloads[i]))
+    return mixed
+
+
+async def _drive(port, payloads, duration, concurrency):
+    import asyncio
+    from kraya.httpclient import Connection, HTTPError
+
+    done = errors = 0
+    latencies = []
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+
+    async def client(offset):
+        nonlocal done, errors
+        conn = Connection("127.0.0.1", port)
+        i = offset
+        while loop.time() < deadline:
+            route, payload = payloads[i % len(payloads)]
+            i += concurrency
+            t = time.perf_counter()
+            try:
+                status, _ = await conn.post(route, payload)
+            except HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - t)
+            done += 1
+            errors += status != 200
+        await conn.close()
+
+    started = loop.time()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return done / (loop.time() - started), errors, latencies
+
+
+def measure_serving(worker_counts, duration=10.0, concurrency=64, port=8765):
+    """Start `python -m kraya.server --workers N` for each N; load it and read its memory.
+
+    The load comes from a single asyncio client process, so on small
+    machines the client itself can become the ceiling at high N.
+    """
+    import asyncio
+    from kraya import procstats
+    from kraya.httpclient import wait_until_ready
+
+    payloads = route_payloads()
+    results = {}
+    for n in worker_counts:
+        proc = subprocess.Popen([sys.executable, "-m", "kraya.server", "--workers", str(n), "--port", str(port)],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            if not asyncio.run(wait_until_ready("127.0.0.1", port)):
+                results[str(n)] = {"error": "server did not become ready"}
+                continue
+            throughput, errors, latencies = asyncio.run(_drive(port, payloads, duration, concurrency))
+            workers = [procstats.memory(pid) for pid in procstats.children(proc.pid)]
+            parent = procstats.memory(proc.pid)
+            mb = lambda b: round(b / 2**20, 1)
+            results[str(n)] = {
+                "throughput_rps": round(throughput, 1),
+                "errors": errors,
+                "latency": summarize(latencies),
+                "parent_rss_mb": mb(parent.get("rss", 0)),
+                "worker_rss_mb": [mb(w.get("rss", 0)) for w in workers],
+                "worker_pss_mb": [mb(w.get("pss", 0)) for w in workers],
+                "total_pss_mb": mb(parent.get("pss", 0) + sum(w.get("pss", 0) for w in workers)),
+            }
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+    base = results.get(str(worker_counts[0]), {}).get("throughput_rps")
+    for n in worker_counts:
+        entry = results[str(n)]
+        if base and "throughput_rps" in entry:
+            entry["speedup"] = round(entry["throughput_rps"] / base, 2)
+    return results
+
+
+# ---------------- BASELINE GATES ---------------- #
+def _flatten(result, prefix=""):
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(report, baseline, tolerance=0.2):
+    """List of human-readable regressions of `report` against `baseline`."""
+    regressions = []
+    for path, result in report.items():
+        if path not in baseline:
+            continue
+        now, before = _flatten(result), _flatten(baseline[path])
+        for metric, old in before.items():
+            new = now.get(metric)
+            if new is None or not old:
+                continue
+            lower = metric in LOWER_IS_BETTER or (metric.startswith("kb_scaling.") and metric.endswith("_ms"))
+            higher = metric in HIGHER_IS_BETTER
+            if lower and new > old * (1 + tolerance):
+                regressions.append(f"{path}.{metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+            elif higher and new < old * (1 - tolerance):
+                regressions.append(f"{path}.{metric}: {old} -> {new} ({(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def run_isolated(path, args):
+    """Measure one path in a fresh interpreter and return its JSON result."""
+    cmd = [sys.executable, "-m", "kraya.bench", "--worker", path,
+           "--iterations", str(args.iterations), "--batch-size", str(args.batch_size)]
+    if args.kb_rows:
+        cmd += ["--kb-rows", args.kb_rows]
+    if args.workload:
+        cmd += ["--workload", args.workload]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the Kraya inference paths.")
+    parser.add_argument("--paths", default=",".join(PATHS))
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--kb-rows", default="1000,10000,100000",
+                        help="comma-separated synthetic electronics KB sizes ('' to skip)")
+    parser.add_argument("--workload", help="recorded JSONL workload instead of the bundled datasets")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--no-compare", action="store_true",
+                        help="report only; skip the baseline gate (a missing baseline is otherwise an error)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--output", help="also write the JSON report here")
+    parser.add_argument("--serving", metavar="N,N,...",
+                        help="only measure the pre-forked API server at these worker counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--worker", choices=PATHS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    kb_rows = [int(r) for r in args.kb_rows.split(",") if r.strip()]
+
+    if args.worker:
+        result = measure_path(args.worker, args.iterations, args.batch_size, kb_rows, args.workload)
+        print(json.dumps(result))
+        return 0
+    if args.serving:
+        counts = [int(n) for n in args.serving.split(",") if n.strip()]
+        result = measure_serving(counts, args.duration, args.concurrency)
+        text = json.dumps({"serving": result}, indent=2)
+        print(text)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        return 0
+
+    report = {}
+    for path in [p.strip() for p in args.paths.split(",") if p.strip()]:
+        print(f"⏱️  {path} ...", file=sys.stderr)
+        report[path] = run_isolated(path, args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    failed = [p for p, r in report.items() if "error" in r]
+    for path in failed:
+        print(f"❌ {path} failed: {report[path]['error']}", file=sys.stderr)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({p: r for p, r in report.items() if "error" not in r}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+        return 1 if failed else 0
+
+    if args.no_compare:
+        return 1 if failed else 0
+    if not os.path.exists(args.baseline):
+        print(f"❌ No baseline at {args.baseline}; record one with --save-baseline "
+              f"(or pass --no-compare to only report).", file=sys.stderr)
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.tolerance)
+    for line in regressions:
+        print(f"🐢 REGRESSION {line}", file=sys.stderr)
+    if not regressions and not failed:
+        print(f"✅ Within {args.tolerance:.0%} of baseline.", file=sys.stderr)
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
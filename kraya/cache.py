@@ -0,0 +1,162 @@
+# kraya/cache.py
+# Bounded result caches.
+#
+# `LRUCache` is a thread-safe LRU map with an optional TTL. `SemanticCache`
+# is a second tier for embedding-keyed results: a lookup hits when a cached
+# query vector of the same group lies within `max_distance` cosine distance
+# of the new one. Both keep hit/miss/eviction counters and report them to
+# kraya.metrics under their `name`.
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from kraya import metrics
+
+
+class CacheStats:
+    __slots__ = ("hits", "misses", "evictions", "expirations")
+
+    def __init__(self):
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def as_dict(self, size, maxsize):
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "maxsize": maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class LRUCache:
+    def __init__(self, maxsize=1024, ttl=None, name="lru"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl is not None and entry[0] < time.monotonic():
+                del self._data[key]
+                self._stats.expirations += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                metrics.inc("cache_misses_total", cache=self.name)
+                return default
+            self._data.move_to_end(key)
+            self._stats.hits += 1
+        metrics.inc("cache_hits_total", cache=self.name)
+        return entry[1]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return self._stats.as_dict(len(self._data), self.maxsize)
+
+
+class SemanticCache:
+    """Near-duplicate cache over L2-normalized query vectors, partitioned by a string group."""
+
+    def __init__(self, maxsize=1024, max_distance=0.05, ttl=None, name="semantic"):
+        self.maxsize = maxsize
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.name = name
+        self._vectors = None                               # (maxsize, dim), allocated on first put
+        self._groups = np.empty(maxsize, dtype=object)
+        self._live = np.zeros(maxsize, dtype=bool)
+        self._expires = np.full(maxsize, np.inf)
+        self._values = [None] * maxsize
+        self._lru = OrderedDict()                          # slot -> None, oldest first
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def get(self, group, vector):
+        with self._lock:
+            hit = None
+            if self._vectors is not None and self._lru:
+                now = time.monotonic()
+                expired = np.flatnonzero(self._live & (self._expires < now))
+                for slot in expired:
+                    self._drop(int(slot))
+                    self._stats.expirations += 1
+                candidates = np.flatnonzero(self._live & (self._groups == group))
+                if candidates.size:
+                    sims = self._vectors[candidates] @ vector
+                    best = int(np.argmax(sims))
+                    if 1.0 - float(sims[best]) <= self.max_distance:
+                        hit = int(candidates[best])
+            if hit is None:
+                self._stats.misses += 1
+            else:
+                self._lru.move_to_end(hit)
+                self._stats.hits += 1
+                value = self._values[hit]
+        if hit is None:
+            metrics.inc("cache_misses_total", cache=self.name)
+            return None
+        metrics.inc("cache_hits_total", cache=self.name)
+        return value
+
+    def put(self, group, vector, value):
+        if self.maxsize <= 0:
+            return
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+            if len(self._lru) >= self.maxsize:
+                oldest = next(iter(self._lru))
+                self._drop(oldest)
+                self._stats.evictions += 1
+            slot = int(np.flatnonzero(~self._live)[0])
+            self._vectors[slot] = vector
+            self._groups[slot] = group
+            self._live[slot] = True
+            self._expires[slot] = time.monotonic() + self.ttl if self.ttl is not None else np.inf
+            self._values[slot] = value
+            self._lru[slot] = None
+
+    def _drop(self, slot):
+        self._live[slot] = False
+        self._values[slot] = None
+        self._groups[slot] = None
+        self._lru.pop(slot, None)
+
+    def clear(self):
+        with self._lock:
+            for slot in list(self._lru):
+                self._drop(slot)
+
+    def stats(self):
+        return self._stats.as_dict(len(self._lru), self.maxsize)
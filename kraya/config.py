@@ -0,0 +1,73 @@
+# kraya/config.py
+# Deployment switches, read once from the environment.
+import json
+import os
+
+
+def env_flag(name, default=True):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+# Load the page models on a background thread after the first page paint
+WARMUP = env_flag("KRAYA_WARMUP", True)
+
+# Verdict animation on the Food page (turn off for kiosk deployments)
+ANIMATIONS = env_flag("KRAYA_ANIMATIONS", True)
+
+# Page inputs in forms and analysis sections in fragments, so typing does not
+# rerun the whole script (0 restores plain widgets for before/after comparisons)
+FORMS = env_flag("KRAYA_FORMS", True)
+
+# Search backend for the electronics matcher: "exact", "ivf" or "hnsw".
+# ANN options, e.g. KRAYA_ELECTRONICS_BACKEND_OPTIONS='{"n_probe": 16}'
+ELECTRONICS_BACKEND = os.environ.get("KRAYA_ELECTRONICS_BACKEND", "exact")
+ELECTRONICS_BACKEND_OPTIONS = json.loads(os.environ.get("KRAYA_ELECTRONICS_BACKEND_OPTIONS", "{}"))
+
+# Score food requests with the compiled TF-IDF x coef scorer (kraya.food_scorer)
+# instead of sklearn's transform + predict. Off until tests/test_food_scorer.py
+# has passed against the deployed model.
+FOOD_FAST_SCORER = env_flag("KRAYA_FOOD_FAST_SCORER", False)
+
+# Reduced-precision CPU inference for the electronics matcher: KB vectors
+# stored as "float32", "float16" or "int8", and the query encoder run as
+# "float32", dynamically quantized "int8" or "onnx" (optionally a specific
+# ONNX file of the model repo, e.g. "onnx/model_qint8_avx512.onnx").
+ELECTRONICS_VECTORS = os.environ.get("KRAYA_ELECTRONICS_VECTORS", "float32")
+EMBED_RUNTIME = os.environ.get("KRAYA_EMBED_RUNTIME", "float32")
+EMBED_ONNX_FILE = os.environ.get("KRAYA_EMBED_ONNX_FILE") or None
+
+# Poll the watched model/KB files every N seconds and hot reload what changed
+# (e.g. after `python -m kraya.kb ...`); 0 disables the watcher.
+RELOAD_INTERVAL = float(os.environ.get("KRAYA_RELOAD_INTERVAL", "5"))
+
+# Lexical (BM25) first stage for electronics support: queries whose keyword
+# confidence exceeds the threshold are answered without an encode; the rest
+# are densely re-ranked within the top-N lexical shortlist (full scan when
+# nothing matches lexically).
+ELECTRONICS_LEXICAL = env_flag("KRAYA_ELECTRONICS_LEXICAL", False)
+ELECTRONICS_LEXICAL_THRESHOLD = float(os.environ.get("KRAYA_ELECTRONICS_LEXICAL_THRESHOLD", "0.8"))
+ELECTRONICS_SHORTLIST = int(os.environ.get("KRAYA_ELECTRONICS_SHORTLIST", "10"))
+
+# Hot-path instrumentation (kraya.metrics); near-zero overhead when off.
+# Export via a Prometheus text endpoint on KRAYA_METRICS_PORT and/or a JSON
+# log line every KRAYA_METRICS_LOG_INTERVAL seconds (0 disables either).
+METRICS = env_flag("KRAYA_METRICS", False)
+METRICS_PORT = int(os.environ.get("KRAYA_METRICS_PORT", "0"))
+METRICS_LOG_INTERVAL = float(os.environ.get("KRAYA_METRICS_LOG_INTERVAL", "0"))
+
+# Electronics query-result cache: exact (device, normalized query) tier, plus
+# an optional semantic tier reusing answers for queries within this cosine
+# distance of a cached one (0 disables the semantic tier).
+ELECTRONICS_CACHE_SIZE = int(os.environ.get("KRAYA_ELECTRONICS_CACHE_SIZE", "2048"))
+ELECTRONICS_CACHE_TTL = float(os.environ.get("KRAYA_ELECTRONICS_CACHE_TTL", "3600")) or None
+ELECTRONICS_SEMANTIC_DISTANCE = float(os.environ.get("KRAYA_ELECTRONICS_SEMANTIC_DISTANCE", "0"))
+
+# Food prediction cache keyed by the canonical ingredient multiset and the
+# numeric features, rounded to multiples of NUMERIC_STEP when it is set
+# (e.g. 5 makes 118 and 121 kcal one entry; 0 keeps exact values).
+FOOD_CACHE_SIZE = int(os.environ.get("KRAYA_FOOD_CACHE_SIZE", "2048"))
+FOOD_CACHE_TTL = float(os.environ.get("KRAYA_FOOD_CACHE_TTL", "3600")) or None
+FOOD_CACHE_NUMERIC_STEP = float(os.environ.get("KRAYA_FOOD_CACHE_NUMERIC_STEP", "0"))
@@ -0,0 +1,196 @@
+# kraya/electronics.py
+# Headless electronics support retriever over the prebuilt embedding index.
+#
+# Support traffic is very repetitive, so results are cached: first by
+# (device, normalized query, k) – a hit skips the encode and the scan – and
+# optionally by query embedding, where a query within a small cosine distance
+# of a cached one reuses its answer. Caches belong to the retriever, which the
+# registry rebuilds together with the index when electronics.json changes.
+#
+# With the lexical stage on (KRAYA_ELECTRONICS_LEXICAL) a cache miss first
+# goes through per-device BM25 (kraya.lexical): a confident keyword match is
+# answered directly, otherwise the dense stage only re-ranks the lexical
+# shortlist. Every result records the path that produced it in `source`.
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from typing import List, Optional
+
+import numpy as np
+
+from kraya import config, metrics
+from kraya.cache import LRUCache, SemanticCache
+from kraya.electronics_index import device_key
+from kraya.lexical import LexicalIndex
+
+DEVICES = ["Smartphone", "Laptop", "TV", "Washing Machine", "Refrigerator"]
+MATCH_THRESHOLD = 0.6
+# Lexical answers list alternatives whose BM25 score is at least this share of the top item's
+LEXICAL_ALTERNATIVE_RATIO = 0.5
+
+# Result sources; the first two are served without a query encode
+SOURCES = ("cache", "lexical", "shortlist", "dense")
+
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_query(text):
+    """Cache key form of a query: lowercase, punctuation dropped, whitespace collapsed."""
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+@dataclass
+class SupportRequest:
+    device: str
+    query: str
+    k: int = 3
+
+
+@dataclass
+class SupportResult:
+    item: Optional[dict]
+    score: float
+    alternatives: List[dict] = field(default_factory=list)
+    threshold: float = MATCH_THRESHOLD
+    source: str = "dense"
+
+    @property
+    def confident(self):
+        return self.item is not None and self.score > self.threshold
+
+    @property
+    def steps(self):
+        return self.item["solution"].split(", ") if self.item else []
+
+
+class ElectronicsRetriever:
+    def __init__(self, index, embed_model, threshold=MATCH_THRESHOLD,
+                 cache_size=None, cache_ttl=None, semantic_distance=None,
+                 lexical=None, lexical_threshold=None, shortlist=None):
+        self.index = index
+        self.embed_model = embed_model
+        self.threshold = threshold
+        lexical = config.ELECTRONICS_LEXICAL if lexical is None else lexical
+        self.lexical = LexicalIndex(index.items) if lexical else None
+        self.lexical_threshold = (config.ELECTRONICS_LEXICAL_THRESHOLD
+                                  if lexical_threshold is None else lexical_threshold)
+        self.shortlist = config.ELECTRONICS_SHORTLIST if shortlist is None else shortlist
+        self._sources = Counter()
+        self._sources_lock = threading.Lock()
+        cache_size = config.ELECTRONICS_CACHE_SIZE if cache_size is None else cache_size
+        cache_ttl = config.ELECTRONICS_CACHE_TTL if cache_ttl is None else cache_ttl
+        if semantic_distance is None:
+            semantic_distance = config.ELECTRONICS_SEMANTIC_DISTANCE
+        self.cache = LRUCache(cache_size, cache_ttl, name="electronics")
+        self.semantic_cache = (
+            SemanticCache(cache_size, semantic_distance, cache_ttl, name="electronics_semantic")
+            if semantic_distance > 0 else None
+        )
+
+    def _cache_key(self, req):
+        # The content hash ties entries to one version of electronics.json
+        return self.index.content_hash, device_key(req.device), normalize_query(req.query), req.k
+
+    def source_stats(self):
+        """Requests per result source and the share answered without an encode."""
+        with self._sources_lock:
+            counts = {source: self._sources[source] for source in SOURCES}
+        total = sum(counts.values())
+        no_encode = counts["cache"] + counts["lexical"]
+        return dict(counts, total=total, no_encode_share=round(no_encode / total, 4) if total else None)
+
+    def _count(self, results):
+        with self._sources_lock:
+            self._sources.update(result.source for result in results)
+        for source, n in Counter(result.source for result in results).items():
+            metrics.inc("results_total", n, page="electronics", source=source)
+
+    def cache_stats(self):
+        stats = {"exact": self.cache.stats()}
+        if self.semantic_cache is not None:
+            stats["semantic"] = self.semantic_cache.stats()
+        return stats
+
+    def clear_cache(self):
+        self.cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+
+    def encode(self, texts):
+        with metrics.span("encode", page="electronics"):
+            vectors = self.embed_model.encode(
+                list(texts), convert_to_numpy=True, show_progress_bar=False
+            )
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _result(self, matches, source="dense"):
+        if not matches:
+            return SupportResult(None, -1.0, threshold=self.threshold, source=source)
+        (item, score), rest = matches[0], matches[1:]
+        alternatives = [alt for alt, s in rest if s > self.threshold]
+        return SupportResult(item, score, alternatives, self.threshold, source)
+
+    def _lexical_stage(self, requests, keys, results, misses):
+        """Answer confident keyword matches; returns (remaining misses, {miss: shortlist})."""
+        remaining, shortlists = [], {}
+        with metrics.span("lexical", page="electronics"):
+            for i in misses:
+                req = requests[i]
+                candidates, confidence = self.lexical.search(req.query, req.device, max(self.shortlist, req.k))
+                if candidates and confidence > self.lexical_threshold:
+                    # score/threshold are the keyword confidence and its cutoff, not cosine
+                    # similarities; alternatives use their own BM25 cutoff
+                    (best, top), rest = candidates[0], candidates[1:req.k]
+                    alternatives = [self.index.items[c] for c, s in rest if s >= LEXICAL_ALTERNATIVE_RATIO * top]
+                    results[i] = SupportResult(self.index.items[best], confidence, alternatives,
+                                               self.lexical_threshold, "lexical")
+                    self.cache.put(keys[i], results[i])
+                else:
+                    remaining.append(i)
+                    if candidates:
+                        shortlists[i] = [c for c, _ in candidates[:self.shortlist]]
+        return remaining, shortlists
+
+    def support_batch(self, requests: List[SupportRequest]) -> List[SupportResult]:
+        if not requests:
+            return []
+        metrics.inc("requests_total", len(requests), page="electronics")
+        keys = [self._cache_key(r) for r in requests]
+        results = [self.cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        results = [replace(r, source="cache") if r is not None else None for r in results]
+        shortlists = {}
+        if misses and self.lexical is not None:
+            misses, shortlists = self._lexical_stage(requests, keys, results, misses)
+
+        if misses:
+            # One encode call for every cache miss in the batch
+            vectors = self.encode([requests[i].query for i in misses])
+            with metrics.span("score", page="electronics"):
+                for i, vec in zip(misses, vectors):
+                    req = requests[i]
+                    group = f"{keys[i][0]}|{keys[i][1]}|{req.k}"
+                    result = self.semantic_cache.get(group, vec) if self.semantic_cache else None
+                    if result is None:
+                        if i in shortlists:
+                            result = self._result(self.index.rerank(vec, shortlists[i], req.k), "shortlist")
+                        else:
+                            result = self._result(self.index.top_k(vec, req.device, req.k))
+                        if self.semantic_cache is not None:
+                            self.semantic_cache.put(group, vec, result)
+                    self.cache.put(keys[i], result)
+                    results[i] = result
+
+        self._count(results)
+        fallbacks = sum(1 for result in results if not result.confident)
+        if fallbacks:
+            metrics.inc("fallback_total", fallbacks, page="electronics", reason="low_score")
+        return results
+
+    def support(self, req: SupportRequest) -> SupportResult:
+        return self.support_batch([req])[0]
@@ -0,0 +1,437 @@
+# kraya/electronics_index.py
+# Precomputed embedding index for the electronics troubleshooting corpus.
+#
+# Every `problem` and `example_queries` entry of electronics.json is embedded
+# once into a normalized float32 matrix (one row per text) with a row -> item
+# mapping. The matrix is persisted next to the JSON together with a content
+# hash, so it is only rebuilt when the JSON (or the embedding model) changes,
+# and it is memory-mapped on load. A request then costs one query encode plus
+# one matrix-vector product. Array files carry the content-hash prefix in
+# their name and the meta file, written last, points at them, so a save
+# commits atomically and readers still mapping the previous version are
+# unaffected (see kraya.kb for incremental updates).
+#
+# Rows are stored grouped by device, and within a device by item, so every
+# device is a contiguous slice of the matrix and every item a contiguous run
+# inside it. Top-k retrieval is then one slice, one product and one
+# `maximum.reduceat` to aggregate the best score per item.
+#
+# For very large KBs a per-device approximate nearest-neighbour backend from
+# kraya.ann can be selected with `set_backend("ivf" | "hnsw", ...)`; device
+# slices smaller than `min_ann_rows` keep using the exact product.
+#
+# The matrix can be stored at reduced precision (`precision="float16"`, or
+# "int8" with one float32 scale per row) to cut its size 2x/4x; scores are
+# computed on float32 blocks dequantized per device slice.
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from kraya import ann
+
+INDEX_VERSION = 2
+MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_JSON_PATH = "electronics/electronics.json"
+PRECISIONS = ("float32", "float16", "int8")
+
+
+# ---------------- HELPERS ---------------- #
+def device_key(device):
+    """Normalize a device name ("Washing Machine 🧺" / "washing machine") for matching."""
+    words = [w for w in device.split() if any(ch.isalnum() for ch in w)]
+    return " ".join(words).lower()
+
+
+def corpus_rows(electronics_data):
+    """Flatten the KB into (texts, row_item), one row per problem/example query, grouped by device."""
+    order = sorted(range(len(electronics_data)), key=lambda i: device_key(electronics_data[i]["device"]))
+    texts, row_item = [], []
+    for i in order:
+        item = electronics_data[i]
+        for text in [item["problem"]] + item.get("example_queries", []):
+            texts.append(text)
+            row_item.append(i)
+    return texts, row_item
+
+
+def content_hash(json_path, model_name=MODEL_NAME):
+    with open(json_path, "rb") as f:
+        return content_hash_bytes(f.read(), model_name)
+
+
+def content_hash_bytes(data, model_name=MODEL_NAME):
+    h = hashlib.sha256()
+    h.update(f"v{INDEX_VERSION}:{model_name}:".encode("utf-8"))
+    h.update(data)
+    return h.hexdigest()
+
+
+def index_paths(json_path, precision="float32", version=None):
+    """File paths of a persisted index; array names include `version` when given."""
+    base = os.path.splitext(json_path)[0] + "_index"
+    if precision != "float32":
+        base += "." + precision
+    arrays = f"{base}.{version}" if version else base
+    return {
+        "vectors": arrays + ".npy",
+        "scales": arrays + ".scales.npy",
+        "rows": arrays + ".rows.npy",
+        "meta": base + ".meta.json",
+    }
+
+
+def _remove_stale_versions(paths, keep):
+    """Delete versioned array files of this index other than the `keep` ones."""
+    base = paths["meta"][: -len(".meta.json")]
+    folder = os.path.dirname(base) or "."
+    pattern = re.compile(re.escape(os.path.basename(base)) + r"\.[0-9a-f]{12}(\.rows|\.scales)?\.npy")
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if pattern.fullmatch(name) and os.path.normpath(path) not in keep:
+            try:
+                os.remove(path)  # processes still mapping it keep their pages
+            except OSError:
+                pass
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize_rows(vectors, precision):
+    """(stored matrix, per-row scales or None) for a normalized float32 matrix."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if precision == "float32":
+        return vectors, None
+    if precision == "float16":
+        return vectors.astype(np.float16), None
+    if precision == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        stored = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return stored, scales.astype(np.float32)
+    raise ValueError(f"Unknown index precision '{precision}' (choose from {list(PRECISIONS)})")
+
+
+def _atomic_save_npy(path, array):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _read_meta(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _atomic_write_json(path, payload):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp, path)
+
+
+# ---------------- INDEX ---------------- #
+class ElectronicsIndex:
+    def __init__(self, items, vectors, row_item, content_hash=None, scales=None):
+        self.items = items
+        self.vectors = vectors
+        self.scales = scales
+        self.precision = {np.dtype(np.float16): "float16", np.dtype(np.int8): "int8"}.get(
+            np.dtype(vectors.dtype), "float32")
+        self.row_item = np.asarray(row_item, dtype=np.int32)
+        self.content_hash = content_hash
+        self.device_ranges = self._device_ranges()
+        self._item_runs = None
+        self.set_backend("exact")
+
+    def set_backend(self, name, min_ann_rows=2048, fetch_factor=4, **options):
+        """Select the search backend; ANN backends are built lazily per device slice."""
+        if name not in ann.BACKENDS:
+            raise ValueError(f"Unknown search backend '{name}' (choose from {sorted(ann.BACKENDS)})")
+        self.backend_name = name
+        self.backend_options = options
+        self.min_ann_rows = min_ann_rows
+        self.fetch_factor = fetch_factor
+        self._backends = {}
+        self._backend_lock = threading.Lock()
+
+    def _backend_for(self, key, row_start, row_end):
+        backend = self._backends.get(key)
+        if backend is None:
+            with self._backend_lock:
+                backend = self._backends.get(key)
+                if backend is None:
+                    backend = ann.make_backend(
+                        self.backend_name, self.dense(row_start, row_end), **self.backend_options
+                    )
+                    self._backends[key] = backend
+        return backend
+
+    def _device_ranges(self):
+        """device -> (row_start, row_end, run_starts, run_items) for each contiguous device slice."""
+        n = len(self.row_item)
+        if n == 0:
+            return {}
+        # Runs of consecutive rows belonging to the same item
+        run_starts = np.flatnonzero(np.r_[True, self.row_item[1:] != self.row_item[:-1]])
+        run_items = self.row_item[run_starts]
+        run_devices = [device_key(self.items[i]["device"]) for i in run_items]
+
+        ranges = {}
+        first = 0
+        for r in range(1, len(run_starts) + 1):
+            if r < len(run_starts) and run_devices[r] == run_devices[first]:
+                continue
+            key = run_devices[first]
+            if key in ranges:
+                raise ValueError(f"Rows for device '{key}' are not contiguous")
+            row_start = int(run_starts[first])
+            row_end = int(run_starts[r]) if r < len(run_starts) else n
+            ranges[key] = (
+                row_start,
+                row_end,
+                (run_starts[first:r] - row_start).astype(np.intp),
+                run_items[first:r],
+            )
+            first = r
+        return ranges
+
+    @property
+    def item_runs(self):
+        """item index -> (row_start, row_end) of its contiguous rows (built on first use)."""
+        if self._item_runs is None:
+            n = len(self.row_item)
+            starts = np.flatnonzero(np.r_[True, self.row_item[1:] != self.row_item[:-1]]) if n else np.array([], int)
+            ends = np.r_[starts[1:], n] if n else starts
+            self._item_runs = {int(i): (int(s), int(e)) for i, s, e in zip(self.row_item[starts], starts, ends)}
+        return self._item_runs
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @property
+    def nbytes(self):
+        """Size of the stored matrix (and scales)."""
+        return int(self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+    def dense(self, row_start=0, row_end=None):
+        """Rows [row_start, row_end) as float32, dequantized if needed."""
+        block = np.asarray(self.vectors[row_start:row_end], dtype=np.float32)
+        if self.scales is not None:
+            block = block * self.scales[row_start:row_end, None]
+        return block
+
+    def quantized(self, precision):
+        """A copy of this index stored at `precision` (same rows, items and hash)."""
+        if precision == self.precision:
+            return self
+        stored, scales = quantize_rows(self.dense(), precision)
+        index = ElectronicsIndex(self.items, stored, self.row_item, self.content_hash, scales)
+        if self.backend_name != "exact":
+            index.set_backend(self.backend_name, self.min_ann_rows, self.fetch_factor, **self.backend_options)
+        return index
+
+    @classmethod
+    def build(cls, items, embed_model, content_hash=None, batch_size=64):
+        # Deduplicated, length-sorted batches (kraya.index_builder also shards large KBs)
+        from kraya.index_builder import build_index
+        return build_index(items, embed_model, content_hash, batch_size)
+
+    def save(self, json_path):
+        version = self.content_hash[:12] if self.content_hash else os.urandom(6).hex()
+        paths = index_paths(json_path, self.precision, version)
+        previous = _read_meta(paths["meta"])
+        _atomic_save_npy(paths["vectors"], np.ascontiguousarray(self.vectors))
+        if self.scales is not None:
+            _atomic_save_npy(paths["scales"], np.asarray(self.scales, dtype=np.float32))
+        _atomic_save_npy(paths["rows"], self.row_item)
+        files = {key: os.path.basename(paths[key]) for key in ("vectors", "rows", "scales")
+                 if key != "scales" or self.scales is not None}
+        # Meta is written last: it is the commit marker for a complete index
+        _atomic_write_json(paths["meta"], {
+            "version": INDEX_VERSION,
+            "model": MODEL_NAME,
+            "content_hash": self.content_hash,
+            "precision": self.precision,
+            "rows": int(self.vectors.shape[0]),
+            "dim": int(self.vectors.shape[1]),
+            "files": files,
+        })
+        # Keep this version and the one before it (readers may still be loading it)
+        folder = os.path.dirname(paths["meta"])
+        keep = {os.path.normpath(os.path.join(folder, name))
+                for meta in (previous or {}, {"files": files}) for name in meta.get("files", {}).values()}
+        _remove_stale_versions(paths, keep)
+
+    @classmethod
+    def load(cls, json_path, items, expected_hash=None, mmap=True, precision="float32"):
+        """Load a persisted index; returns None when it is missing or stale."""
+        paths = index_paths(json_path, precision)
+        try:
+            with open(paths["meta"]) as f:
+                meta = json.load(f)
+            folder = os.path.dirname(paths["meta"])
+            paths.update({key: os.path.join(folder, name) for key, name in meta.get("files", {}).items()})
+            if meta.get("version") != INDEX_VERSION or meta.get("precision", "float32") != precision:
+                return None
+            if expected_hash is not None and meta.get("content_hash") != expected_hash:
+                return None
+            vectors = np.load(paths["vectors"], mmap_mode="r" if mmap else None)
+            row_item = np.load(paths["rows"])
+            scales = np.load(paths["scales"]) if precision == "int8" else None
+        except (OSError, ValueError):
+            return None
+        if vectors.shape[0] != meta.get("rows") or len(row_item) != vectors.shape[0]:
+            return None
+        if scales is not None and scales.shape[0] != vectors.shape[0]:
+            return None
+        if len(row_item) and int(row_item.max()) >= len(items):
+            return None
+        try:
+            return cls(items, vectors, row_item, meta.get("content_hash"), scales)
+        except ValueError:
+            return None
+
+    @classmethod
+    def load_or_build(cls, json_path, embed_model, items=None, backend="exact", backend_options=None,
+                      precision="float32"):
+        """Load the index at `precision`, deriving it from (or building) the float32 index if needed.
+
+        `embed_model` may be a zero-argument callable; it is only called when
+        the index has to be (re)built.
+        """
+        if items is None:
+            with open(json_path, "r") as f:
+                items = json.load(f)
+        digest = content_hash(json_path)
+        index = cls.load(json_path, items, expected_hash=digest, precision=precision)
+        if index is None:
+            index = cls.load(json_path, items, expected_hash=digest)
+            if index is None:
+                if not hasattr(embed_model, "encode"):
+                    embed_model = embed_model()
+                index = cls.build(items, embed_model, content_hash=digest)
+            index = index.quantized(precision)
+            try:
+                index.save(json_path)
+                # Re-open memory-mapped so every process shares the page cache copy
+                index = cls.load(json_path, items, expected_hash=digest, precision=precision) or index
+            except OSError:
+                pass
+        if backend != "exact":
+            index.set_backend(backend, **(backend_options or {}))
+        return index
+
+    # ---------------- SEARCH ---------------- #
+    def encode_query(self, embed_model, text):
+        vec = embed_model.encode(text, convert_to_numpy=True, show_progress_bar=False)
+        return _normalize(vec)
+
+    def top_k(self, query_vec, device, k=3):
+        """Top-k items for `device` as [(item, score)], scoring each item by its best row."""
+        entry = self.device_ranges.get(device_key(device))
+        if entry is None or k <= 0:
+            return []
+        row_start, row_end, run_starts, run_items = entry
+        query_vec = np.asarray(query_vec, dtype=np.float32)
+        if self.backend_name != "exact" and row_end - row_start >= self.min_ann_rows:
+            return self._top_k_ann(query_vec, device_key(device), entry, k)
+        scores = self._row_scores(query_vec, row_start, row_end)
+        item_scores = np.maximum.reduceat(scores, run_starts)
+        k = min(k, item_scores.size)
+        if k < item_scores.size:
+            top = np.sort(np.argpartition(-item_scores, k - 1)[:k])
+        else:
+            top = np.arange(item_scores.size)
+        # Stable sort keeps KB order on ties, like the original first-wins loop
+        top = top[np.argsort(-item_scores[top], kind="stable")]
+        return [(self.items[run_items[i]], float(item_scores[i])) for i in top]
+
+    def _row_scores(self, query_vec, row_start, row_end):
+        scores = np.asarray(self.vectors[row_start:row_end], dtype=np.float32) @ query_vec
+        if self.scales is not None:
+            # Fold the per-row scales into the scores instead of dequantizing the block
+            scores *= self.scales[row_start:row_end]
+        return scores
+
+    def rerank(self, query_vec, item_ids, k=3):
+        """Top-k among `item_ids` only, as [(item, score)] – dense re-ranking of a shortlist."""
+        query_vec = np.asarray(query_vec, dtype=np.float32)
+        runs = self.item_runs
+        scored = []
+        for i in item_ids:
+            row_start, row_end = runs[i]
+            scored.append((-float(self._row_scores(query_vec, row_start, row_end).max()), row_start, i))
+        scored.sort()  # ties keep KB (row) order
+        return [(self.items[i], -neg) for neg, _, i in scored[:k]]
+
+    def _top_k_ann(self, query_vec, key, entry, k):
+        row_start, row_end, run_starts, run_items = entry
+        backend = self._backend_for(key, row_start, row_end)
+        # Over-fetch rows: several rows of one item may crowd the candidate list
+        rows, scores = backend.search(query_vec, k * self.fetch_factor)
+        if rows.size == 0:
+            return []
+        runs = np.searchsorted(run_starts, rows, side="right") - 1
+        best = {}
+        for run, score in zip(runs.tolist(), scores.tolist()):
+            if run not in best:  # candidates arrive best first
+                best[run] = score
+        ranked = sorted(best.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+        return [(self.items[run_items[run]], float(score)) for run, score in ranked]
+
+    def best_match(self, query_vec, device):
+        """Return (item, score) of the best item for `device`, or (None, -1.0)."""
+        matches = self.top_k(query_vec, device, k=1)
+        return matches[0] if matches else (None, -1.0)
+
+    def match(self, embed_model, text, device):
+        return self.best_match(self.encode_query(embed_model, text), device)
+
+    def search(self, embed_model, text, device, k=3):
+        return self.top_k(self.encode_query(embed_model, text), device, k)
+
+
+# ---------------- OFFLINE BUILD ---------------- #
+def main(argv=None):
+    import argparse
+    from sentence_transformers import SentenceTransformer
+
+    parser = argparse.ArgumentParser(description="Build the electronics embedding index.")
+    parser.add_argument("json_path", nargs="?", default=DEFAULT_JSON_PATH)
+    parser.add_argument("--force", action="store_true", help="rebuild even if the index is fresh")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float32",
+                        help="also write a reduced-precision copy of the index")
+    args = parser.parse_args(argv)
+
+    with open(args.json_path, "r") as f:
+        items = json.load(f)
+    digest = content_hash(args.json_path)
+    index = None if args.force else ElectronicsIndex.load(args.json_path, items, expected_hash=digest)
+    if index is not None:
+        print(f"Index is up to date ({digest[:12]}).")
+    else:
+        index = ElectronicsIndex.build(items, SentenceTransformer(MODEL_NAME), content_hash=digest)
+        index.save(args.json_path)
+        print(f"Built {len(index)} rows x {index.vectors.shape[1]} dims ({digest[:12]}).")
+    if args.precision != "float32":
+        reduced = index.quantized(args.precision)
+        reduced.save(args.json_path)
+        print(f"Wrote {args.precision} copy: {reduced.nbytes / 2**10:.0f} KiB (float32 {index.nbytes / 2**10:.0f} KiB).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
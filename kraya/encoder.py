@@ -0,0 +1,51 @@
+# kraya/encoder.py
+# Query-encoder runtimes for the electronics matcher.
+#
+#   float32  the stock SentenceTransformer (PyTorch, fp32)
+#   int8     the same model with dynamic int8 quantization of its Linear layers
+#            (torch.ao.quantization.quantize_dynamic); weights ~4x smaller
+#   onnx     sentence-transformers' ONNX Runtime backend (needs
+#            `pip install sentence-transformers[onnx]`); pass `onnx_file`,
+#            e.g. "onnx/model_qint8_avx512.onnx", for a pre-quantized export
+#
+# All runtimes expose the SentenceTransformer .encode() API. KB vectors are
+# always built with the float32 model; only queries go through the selected
+# runtime (`python -m kraya.precision` checks the top-1 matches agree).
+RUNTIMES = ("float32", "int8", "onnx")
+
+
+def load_encoder(model_name, runtime="float32", onnx_file=None, threads=None):
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Unknown encoder runtime '{runtime}' (choose from {list(RUNTIMES)})")
+    from sentence_transformers import SentenceTransformer
+
+    if runtime == "onnx":
+        model_kwargs = {"file_name": onnx_file} if onnx_file else None
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs, device="cpu")
+
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    model = SentenceTransformer(model_name, device="cpu")
+    if runtime == "int8":
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model.eval()
+
+
+def parameter_bytes(model):
+    """Approximate in-memory weight size of a torch encoder (None for other runtimes)."""
+    try:
+        import torch
+    except ImportError:
+        return None
+    if not isinstance(model, torch.nn.Module):
+        return None
+    total = sum(t.numel() * t.element_size() for t in model.state_dict().values() if isinstance(t, torch.Tensor))
+    # Dynamically quantized Linear layers keep packed weights outside the float tensors
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if isinstance(packed, torch.nn.Module) and hasattr(packed, "_weight_bias"):
+            weight, bias = packed._weight_bias()
+            total += weight.numel() * weight.element_size()
+            total += bias.numel() * bias.element_size() if bias is not None else 0
+    return total
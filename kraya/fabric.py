@@ -0,0 +1,153 @@
+# kraya/fabric.py
+# Headless fabric recommender: one-hot encoder + RandomForest + label encoder.
+#
+# The input space is tiny: every value the UI offers (4 seasons x 3 skin
+# tones x 4 weathers x 3 work levels = 144 combinations) plus any value the
+# encoder was trained on that the UI lacks (the dataset's "Rainy" season,
+# 180 combinations in all). Every combination is batch-predicted once at
+# load time into a FabricTable (group index + class probabilities per
+# combination, addressed by a mixed-radix index); values the encoder never
+# saw are scored through its handle_unknown='ignore'. Requests are answered
+# by an O(1) lookup; the sklearn pipeline is only used as a fallback for
+# values the table does not know (i.e. the schema changed).
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from kraya import metrics
+
+SEASONS = ["Summer", "Winter", "Spring", "Autumn"]
+SKIN_TONES = ["Fair", "Medium", "Dark"]
+WEATHERS = ["Hot", "Cold", "Humid", "Dry"]
+WORK_LEVELS = ["High", "Medium", "Low"]
+FEATURE_COLUMNS = ["Season", "SkinTone", "Weather", "WorkLevel"]
+# Values offered by the UI, per feature column
+INPUT_VALUES = [SEASONS, SKIN_TONES, WEATHERS, WORK_LEVELS]
+
+# Fabric group -> fabrics, as grouped by the training notebook
+FABRIC_MAP = {
+    "Breathable": ["Cotton", "Linen", "Rayon"],
+    "Synthetic": ["Polyester", "Nylon"],
+    "Warm": ["Wool", "Velvet"],
+    "LightSoft": ["Satin", "Silk", "Chiffon", "Georgette"],
+    "Denim": ["Denim"]
+}
+ALL_FABRICS = sorted(f for fabrics in FABRIC_MAP.values() for f in fabrics)
+
+
+@dataclass
+class FabricRequest:
+    season: str
+    skin_tone: str
+    weather: str
+    work_level: str
+    fabric: Optional[str] = None
+
+    def features(self):
+        return [self.season, self.skin_tone, self.weather, self.work_level]
+
+
+@dataclass
+class FabricResult:
+    group: str
+    fabrics: List[str]
+    fabric: Optional[str] = None
+    probabilities: Optional[Dict[str, float]] = None
+
+    @property
+    def fabric_ok(self):
+        return self.fabric in self.fabrics
+
+
+class FabricTable:
+    """Precomputed predictions for every combination of the categorical inputs."""
+
+    def __init__(self, categories, groups, proba):
+        self.categories = [list(c) for c in categories]
+        self.groups = list(groups)
+        self.proba = np.asarray(proba, dtype=np.float32)
+        self.group_index = self.proba.argmax(axis=1).astype(np.int16)
+        self._codes = [{value: i for i, value in enumerate(c)} for c in self.categories]
+        sizes = [len(c) for c in self.categories]
+        self._strides = [int(np.prod(sizes[i + 1:])) for i in range(len(sizes))]
+        if self.proba.shape != (int(np.prod(sizes)), len(self.groups)):
+            raise ValueError("Fabric table shape does not match its categories")
+
+    @classmethod
+    def build(cls, encoder, model, label):
+        import pandas as pd
+
+        # UI values first, then trained values the UI does not offer
+        categories = [list(ui) + [str(v) for v in trained if str(v) not in ui]
+                      for ui, trained in zip(INPUT_VALUES, encoder.categories_)]
+        combos = list(itertools.product(*categories))
+        X = pd.DataFrame(combos, columns=FEATURE_COLUMNS)
+        proba = model.predict_proba(encoder.transform(X))
+        groups = [str(g) for g in label.inverse_transform(model.classes_)]
+        return cls(categories, groups, proba)
+
+    def index(self, features):
+        """Row of the table for `features`, or None if a value is unknown."""
+        idx = 0
+        for codes, stride, value in zip(self._codes, self._strides, features):
+            code = codes.get(value)
+            if code is None:
+                return None
+            idx += code * stride
+        return idx
+
+    def lookup(self, features):
+        idx = self.index(features)
+        if idx is None:
+            return None
+        proba = self.proba[idx]
+        return self.groups[self.group_index[idx]], dict(zip(self.groups, proba.tolist()))
+
+    def covers(self, values=INPUT_VALUES):
+        """True if every value in `values` (one list per feature column) has a row."""
+        return all(set(v) <= set(c) for v, c in zip(values, self.categories))
+
+
+class FabricRecommender:
+    def __init__(self, model_dict=None, table=None):
+        self.encoder = model_dict["encoder"] if model_dict else None
+        self.model = model_dict["model"] if model_dict else None
+        self.label = model_dict["label"] if model_dict else None
+        if table is None:
+            table = FabricTable.build(self.encoder, self.model, self.label)
+        self.table = table
+
+    def predict_groups(self, rows):
+        """Slow path through the sklearn pipeline, for inputs outside the table."""
+        import pandas as pd
+
+        if self.model is None:
+            raise ValueError(f"Unknown fabric inputs {rows} and no model to fall back to")
+        X = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+        pred_encoded = self.model.predict(self.encoder.transform(X))
+        return [str(g) for g in self.label.inverse_transform(pred_encoded)]
+
+    def recommend_batch(self, requests: List[FabricRequest]) -> List[FabricResult]:
+        metrics.inc("requests_total", len(requests), page="fabric")
+        results = [None] * len(requests)
+        misses = []
+        with metrics.span("predict", page="fabric"):
+            for i, r in enumerate(requests):
+                hit = self.table.lookup(r.features())
+                if hit is None:
+                    misses.append(i)
+                    continue
+                group, proba = hit
+                results[i] = FabricResult(group, FABRIC_MAP.get(group, []), r.fabric, proba)
+        if misses:
+            metrics.inc("fallback_total", len(misses), page="fabric", reason="table_miss")
+            with metrics.span("predict_fallback", page="fabric"):
+                groups = self.predict_groups([requests[i].features() for i in misses])
+            for i, g in zip(misses, groups):
+                results[i] = FabricResult(g, FABRIC_MAP.get(g, []), requests[i].fabric)
+        return results
+
+    def recommend(self, req: FabricRequest) -> FabricResult:
+        return self.recommend_batch([req])[0]
@@ -0,0 +1,241 @@
+# kraya/food.py
+# Headless food classifier: TF-IDF vectorizer + weight-goal model, no Streamlit.
+#
+# Food traffic repeats the same products with small variations, so predicted
+# labels are cached by a canonical form of the request: the ingredient
+# multiset (order, case and whitespace dropped where the vectorizer ignores
+# them anyway) plus the numeric features, optionally rounded to
+# KRAYA_FOOD_CACHE_NUMERIC_STEP. The goal is not part of the key – it only
+# decides matches_goal. The cache belongs to the classifier, which the
+# registry rebuilds when the model artifact changes.
+from dataclasses import dataclass, replace
+from typing import List
+
+import numpy as np
+
+from kraya import config, metrics
+from kraya.cache import LRUCache
+
+GOALS = ["Weight Loss", "Weight Gain", "Balanced"]
+
+
+@dataclass
+class FoodRequest:
+    ingredients: str
+    goal: str = "Balanced"
+    calories: float = 0
+    protein: float = 0.0
+    carbs: float = 0.0
+    fiber: float = 0.0
+    fat: float = 0.0
+    sugar: float = 0.0
+
+    @property
+    def first_ingredient(self):
+        return self.ingredients.split(",")[0].strip()
+
+
+@dataclass
+class FoodResult:
+    label: str
+    goal: str
+    matches_goal: bool
+
+
+def goal_matches(label, goal):
+    return label.lower() in goal.lower()
+
+
+def hstack_csr(text_block, numeric_block):
+    """[text_block | numeric_block] as CSR, written into preallocated arrays in one pass."""
+    from scipy.sparse import csr_matrix
+
+    text_block = text_block.tocsr()
+    numeric_block = np.asarray(numeric_block, dtype=np.float64)
+    n, vocab = text_block.shape
+    k = numeric_block.shape[1]
+    row_nnz = np.diff(text_block.indptr)
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(row_nnz + k, out=indptr[1:])
+    data = np.empty(indptr[-1], dtype=np.float64)
+    indices = np.empty(indptr[-1], dtype=np.int32)
+
+    # Text entries keep their in-row position; numeric entries follow them
+    rows = np.repeat(np.arange(n), row_nnz)
+    text_dest = indptr[rows] + (np.arange(text_block.nnz) - text_block.indptr[rows])
+    data[text_dest] = text_block.data
+    indices[text_dest] = text_block.indices
+    num_dest = (indptr[:-1] + row_nnz)[:, None] + np.arange(k)
+    data[num_dest] = numeric_block
+    indices[num_dest] = vocab + np.arange(k, dtype=np.int32)
+    return csr_matrix((data, indices, indptr), shape=(n, vocab + k))
+
+
+class FoodClassifier:
+    """Two feature layouts are supported:
+
+    * structured (the training notebook's `{model, vectorizer, scaler}` bundle):
+      TF-IDF over the ingredients hstacked with the StandardScaler-scaled
+      numeric columns;
+    * legacy (separate model + vectorizer pickles): ingredients and numbers
+      joined into one text and pushed through the TF-IDF vectorizer.
+
+    When the vectorizer/model pair can be compiled into a SparseFoodScorer
+    (and `fast` is on), predictions skip the sklearn transform/predict
+    calls; `python -m kraya.food_scorer` checks both paths agree.
+    """
+
+    # Column order used by the notebook when fitting the scaler
+    NUMERIC_COLUMNS = ["sugar", "fat", "protein", "calories", "carbs", "fiber"]
+
+    def __init__(self, model, vectorizer, scaler=None, fast=None,
+                 cache_size=None, cache_ttl=None, numeric_step=None):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.scaler = scaler
+        self.scorer = None
+        cache_size = config.FOOD_CACHE_SIZE if cache_size is None else cache_size
+        cache_ttl = config.FOOD_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.numeric_step = config.FOOD_CACHE_NUMERIC_STEP if numeric_step is None else numeric_step
+        self.cache = LRUCache(cache_size, cache_ttl, name="food")
+        self._canonical = self._canonical_rules(vectorizer)
+        if config.FOOD_FAST_SCORER if fast is None else fast:
+            from kraya.food_scorer import SparseFoodScorer
+            try:
+                self.scorer = SparseFoodScorer.from_sklearn(model, vectorizer)
+            except (AttributeError, ValueError):
+                pass  # not a plain TF-IDF + linear model: keep the sklearn path
+        if scaler is not None:
+            mean = getattr(scaler, "mean_", None)
+            scale = getattr(scaler, "scale_", None)
+            self._mean = np.zeros(len(self.NUMERIC_COLUMNS)) if mean is None else np.asarray(mean, dtype=np.float64)
+            self._scale = np.ones(len(self.NUMERIC_COLUMNS)) if scale is None else np.asarray(scale, dtype=np.float64)
+
+    @staticmethod
+    def _canonical_rules(vectorizer):
+        """(sort ingredients, lowercase, collapse whitespace) – only what the vectorizer can't tell apart."""
+        word = (getattr(vectorizer, "analyzer", "word") == "word"
+                and not getattr(vectorizer, "tokenizer", None) and not getattr(vectorizer, "preprocessor", None))
+        pattern = getattr(vectorizer, "token_pattern", None) or ""
+        unigrams = tuple(getattr(vectorizer, "ngram_range", (1, 1)))[1] == 1
+        lowercase = bool(getattr(vectorizer, "lowercase", False))
+        spaceless = bool(pattern) and " " not in pattern and "\\s" not in pattern
+        return word and unigrams, word and lowercase, word and spaceless
+
+    def _quantize(self, value):
+        step = self.numeric_step
+        return round(round(float(value) / step) * step, 6) if step else value
+
+    def _canonical_number(self, col, value):
+        value = self._quantize(value)
+        if self.structured:
+            return value
+        # Legacy layout reads the numbers as text: write them the way the Food
+        # page submits them (whole calories as int, the rest as float), so that
+        # 120 and 120.0 give one feature text and one cache key
+        value = float(value)
+        return int(value) if col == "calories" and value.is_integer() else value
+
+    def canonical_request(self, req: FoodRequest) -> FoodRequest:
+        """`req` with its numeric features rounded to the cache's numeric step and normalised."""
+        if self.structured and not self.numeric_step:
+            return req
+        return replace(req, **{col: self._canonical_number(col, getattr(req, col)) for col in self.NUMERIC_COLUMNS})
+
+    def cache_key(self, req: FoodRequest):
+        """Hashable key equal for requests the model cannot tell apart (goal excluded)."""
+        sort, lower, collapse = self._canonical
+        parts = req.ingredients.split(",")
+        if lower:
+            parts = [p.lower() for p in parts]
+        if collapse:
+            parts = [" ".join(p.split()) for p in parts]
+        if sort:
+            parts = sorted(p for p in parts if p)
+        req = self.canonical_request(req)
+        return tuple(parts), tuple(float(getattr(req, col)) for col in self.NUMERIC_COLUMNS)
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def clear_cache(self):
+        self.cache.clear()
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        return cls(bundle["model"], bundle["vectorizer"], bundle.get("scaler"))
+
+    @property
+    def structured(self):
+        return self.scaler is not None
+
+    @staticmethod
+    def feature_text(req: FoodRequest) -> str:
+        # Legacy layout: ingredients + numeric features as one text
+        return f"{req.ingredients} {req.calories} {req.protein} {req.carbs} {req.fiber} {req.fat} {req.sugar}"
+
+    def numeric_block(self, requests: List[FoodRequest]):
+        values = np.array(
+            [[float(getattr(r, col)) for col in self.NUMERIC_COLUMNS] for r in requests],
+            dtype=np.float64,
+        )
+        # StandardScaler.transform without the DataFrame/validation overhead
+        return (values - self._mean) / self._scale
+
+    def features(self, requests: List[FoodRequest]):
+        """Model input matrix for a batch of requests."""
+        if not self.structured:
+            with metrics.span("features", page="food"):
+                texts = [self.feature_text(r) for r in requests]
+            with metrics.span("vectorize", page="food"):
+                return self.vectorizer.transform(texts)
+        with metrics.span("vectorize", page="food"):
+            text_block = self.vectorizer.transform([r.ingredients for r in requests])
+        with metrics.span("features", page="food"):
+            return hstack_csr(text_block, self.numeric_block(requests))
+
+    def scorer_inputs(self, requests: List[FoodRequest]):
+        """(texts, scaled numeric block or None) for the SparseFoodScorer."""
+        if not self.structured:
+            return [self.feature_text(r) for r in requests], None
+        return [r.ingredients for r in requests], self.numeric_block(requests)
+
+    def predict_labels(self, requests: List[FoodRequest]) -> List[str]:
+        if self.scorer is not None:
+            with metrics.span("score", page="food"):
+                return self.scorer.predict(*self.scorer_inputs(requests))
+        X = self.features(requests)
+        with metrics.span("predict", page="food"):
+            return [str(label) for label in self.model.predict(X)]
+
+    def predict_proba(self, requests: List[FoodRequest]):
+        """(labels, probabilities[n, n_classes], classes) for a batch of requests."""
+        if self.scorer is not None:
+            with metrics.span("score", page="food"):
+                proba = self.scorer.predict_proba(*self.scorer_inputs(requests))
+        else:
+            X = self.features(requests)
+            with metrics.span("predict", page="food"):
+                proba = self.model.predict_proba(X)
+        classes = [str(c) for c in self.model.classes_]
+        labels = [classes[i] for i in proba.argmax(axis=1)]
+        return labels, proba, classes
+
+    def classify_batch(self, requests: List[FoodRequest]) -> List[FoodResult]:
+        if not requests:
+            return []
+        metrics.inc("requests_total", len(requests), page="food")
+        keys = [self.cache_key(r) for r in requests]
+        labels = [self.cache.get(key) for key in keys]
+        misses = [i for i, label in enumerate(labels) if label is None]
+        if misses:
+            # One vectorize + predict for every cache miss in the batch
+            predicted = self.predict_labels([self.canonical_request(requests[i]) for i in misses])
+            for i, label in zip(misses, predicted):
+                labels[i] = label
+                self.cache.put(keys[i], label)
+        return [FoodResult(label, r.goal, goal_matches(label, r.goal)) for r, label in zip(requests, labels)]
+
+    def classify(self, req: FoodRequest) -> FoodResult:
+        return self.classify_batch([req])[0]
@@ -0,0 +1,221 @@
+# kraya/food_scorer.py
+# Direct scorer for the food TF-IDF + logistic-regression model.
+#
+# The vectorizer's vocabulary, IDF and preprocessing settings and the
+# model's coef_/intercept_ are folded once into a (vocab, n_classes) matrix
+# of idf * coef. Scoring a product is then: preprocess + tokenize the text
+# the way TfidfVectorizer does, count the known terms, and sum their rows
+# weighted by tf / norm – no CSR matrix, no sklearn validation. Numeric
+# columns of the structured layout add their (already scaled) values times
+# their coefficients. Probabilities follow LogisticRegression.predict_proba
+# (softmax for multinomial, normalized sigmoids for one-vs-rest).
+#
+#   python -m kraya.food_scorer                 # parity + latency check on every CSV row
+#   python -m kraya.food_scorer path/to/other.csv --tolerance 1e-9
+import math
+import re
+import unicodedata
+
+import numpy as np
+
+
+def _strip_accents_unicode(text):
+    normalized = unicodedata.normalize("NFKD", text)
+    if normalized == text:
+        return text
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def _strip_accents_ascii(text):
+    return unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("ASCII")
+
+
+class SparseFoodScorer:
+    def __init__(self, vocabulary, idf, coef, intercept, classes, lowercase=True,
+                 token_pattern=r"(?u)\b\w\w+\b", ngram_range=(1, 1), stop_words=None,
+                 strip_accents=None, binary=False, norm="l2", use_idf=True, sublinear_tf=False,
+                 ovr=False):
+        if strip_accents not in (None, "ascii", "unicode"):
+            raise ValueError(f"Unsupported strip_accents={strip_accents!r}")
+        if norm not in (None, "l1", "l2"):
+            raise ValueError(f"Unsupported norm={norm!r}")
+        self.vocabulary = dict(vocabulary)
+        self.lowercase = lowercase
+        self.token_re = re.compile(token_pattern)
+        if self.token_re.groups > 1:
+            raise ValueError("token_pattern must have at most one capture group")
+        self.min_n, self.max_n = ngram_range
+        self.stop_words = frozenset(stop_words) if stop_words else None
+        self.accents = {"ascii": _strip_accents_ascii, "unicode": _strip_accents_unicode}.get(strip_accents)
+        self.binary = binary
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.ovr = ovr
+        self.classes = [str(c) for c in classes]
+
+        vocab_size = len(self.vocabulary)
+        coef = np.atleast_2d(np.asarray(coef, dtype=np.float64))
+        self.intercept = np.atleast_1d(np.asarray(intercept, dtype=np.float64))
+        idf = np.asarray(idf, dtype=np.float64) if use_idf else np.ones(vocab_size)
+        self.idf = idf
+        # Row per term: idf * coef; numeric columns (structured layout) follow the vocabulary
+        self.term_weights = np.ascontiguousarray(coef[:, :vocab_size].T * idf[:, None])
+        self.numeric_weights = np.ascontiguousarray(coef[:, vocab_size:].T)
+
+    @classmethod
+    def from_sklearn(cls, model, vectorizer):
+        """Scorer equivalent to `model` on `vectorizer` features; ValueError if unsupported."""
+        if getattr(vectorizer, "analyzer", "word") != "word" or vectorizer.preprocessor or vectorizer.tokenizer:
+            raise ValueError("Only the default word analyzer is supported")
+        stop_words = vectorizer.get_stop_words()
+        n_classes = len(model.classes_)
+        multi_class = getattr(model, "multi_class", "auto")
+        ovr = multi_class in ("ovr", "warn") or (
+            multi_class in ("auto", "deprecated") and (n_classes <= 2 or getattr(model, "solver", "lbfgs") == "liblinear")
+        )
+        return cls(
+            vectorizer.vocabulary_, vectorizer.idf_ if vectorizer.use_idf else None, model.coef_,
+            model.intercept_, model.classes_, vectorizer.lowercase, vectorizer.token_pattern,
+            vectorizer.ngram_range, stop_words, vectorizer.strip_accents, vectorizer.binary,
+            vectorizer.norm, vectorizer.use_idf, vectorizer.sublinear_tf, ovr,
+        )
+
+    # ---------------- TEXT ---------------- #
+    def terms(self, text):
+        """Vocabulary column -> raw count for one document (TfidfVectorizer's word analyzer)."""
+        if self.lowercase:
+            text = text.lower()
+        if self.accents is not None:
+            text = self.accents(text)
+        tokens = self.token_re.findall(text)
+        if self.stop_words is not None:
+            tokens = [t for t in tokens if t not in self.stop_words]
+        counts = {}
+        vocabulary = self.vocabulary
+        for n in range(self.min_n, self.max_n + 1):
+            grams = tokens if n == 1 else (" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+            for gram in grams:
+                col = vocabulary.get(gram)
+                if col is not None:
+                    counts[col] = counts.get(col, 0) + 1
+        return counts
+
+    def _text_logits(self, text):
+        counts = self.terms(text)
+        if not counts:
+            return np.zeros(self.term_weights.shape[1])
+        cols = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.binary:
+            tf[:] = 1.0
+        elif self.sublinear_tf:
+            tf = np.log(tf) + 1.0
+        if self.norm is not None:
+            weighted = tf * self.idf[cols]
+            norm = math.sqrt(float(weighted @ weighted)) if self.norm == "l2" else float(np.abs(weighted).sum())
+            if norm > 0:
+                tf = tf / norm
+        return tf @ self.term_weights[cols]
+
+    # ---------------- SCORING ---------------- #
+    def decision_function(self, texts, numeric=None):
+        """Raw logits, shape (n, n_coef_rows), for texts (+ scaled numeric columns)."""
+        logits = np.empty((len(texts), self.term_weights.shape[1]))
+        for i, text in enumerate(texts):
+            logits[i] = self._text_logits(text)
+        if numeric is not None and self.numeric_weights.shape[0]:
+            logits += np.asarray(numeric, dtype=np.float64) @ self.numeric_weights
+        logits += self.intercept
+        return logits
+
+    def predict_proba(self, texts, numeric=None):
+        logits = self.decision_function(texts, numeric)
+        if logits.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-logits[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        if self.ovr:
+            p = 1.0 / (1.0 + np.exp(-logits))
+            return p / p.sum(axis=1, keepdims=True)
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        return logits / logits.sum(axis=1, keepdims=True)
+
+    def predict(self, texts, numeric=None):
+        logits = self.decision_function(texts, numeric)
+        if logits.shape[1] == 1:
+            return [self.classes[int(v > 0)] for v in logits[:, 0]]
+        return [self.classes[i] for i in logits.argmax(axis=1)]
+
+
+# ---------------- PARITY CHECK ---------------- #
+def parity_check(classifier, requests, tolerance=1e-9):
+    """Compare the scorer with the sklearn objects of `classifier` on every request."""
+    from kraya.food import FoodClassifier
+
+    reference = FoodClassifier(classifier.model, classifier.vectorizer, classifier.scaler, fast=False)
+    fast = FoodClassifier(classifier.model, classifier.vectorizer, classifier.scaler, fast=True)
+    if fast.scorer is None:
+        raise ValueError("This vectorizer/model cannot be compiled into a SparseFoodScorer")
+    ref_labels, ref_proba, _ = reference.predict_proba(requests)
+    labels, proba, _ = fast.predict_proba(requests)
+    ref_predicted = reference.predict_labels(requests)
+    predicted = fast.predict_labels(requests)
+    label_mismatches = [i for i, (a, b) in enumerate(zip(ref_predicted, predicted)) if a != b]
+    diff = np.abs(proba - ref_proba).max(axis=1)
+    return {
+        "rows": len(requests),
+        "label_mismatches": label_mismatches,
+        "proba_label_mismatches": [i for i, (a, b) in enumerate(zip(ref_labels, labels)) if a != b],
+        "max_abs_proba_diff": float(diff.max()) if len(diff) else 0.0,
+        "rows_over_tolerance": [int(i) for i in np.flatnonzero(diff > tolerance)],
+    }
+
+
+def single_item_latency(classifier, requests, iterations=1000):
+    """p50/p95/p99 of classify() for one request at a time, sklearn vs scorer."""
+    import time
+    from kraya.food import FoodClassifier
+    from kraya.stats import summarize
+
+    report = {}
+    for name, fast in (("sklearn", False), ("scorer", True)):
+        engine = FoodClassifier(classifier.model, classifier.vectorizer, classifier.scaler, fast=fast, cache_size=0)
+        latencies = []
+        for i in range(iterations):
+            t = time.perf_counter()
+            engine.classify(requests[i % len(requests)])
+            latencies.append(time.perf_counter() - t)
+        report[name] = summarize(latencies)
+    return report
+
+
+def main(argv=None):
+    import argparse
+    import csv
+    import json
+    from kraya import models
+    from kraya.batch_food import row_request
+
+    parser = argparse.ArgumentParser(description="Check the compiled food scorer against sklearn.")
+    parser.add_argument("csv", nargs="?", default="food/food_dataset_realistic.csv")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="max allowed |probability difference|")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    with open(args.csv, newline="", encoding="utf-8") as f:
+        requests = [row_request(row) for row in csv.DictReader(f)]
+    classifier = models.get("food_classifier")
+    report = parity_check(classifier, requests, args.tolerance)
+    report["latency"] = single_item_latency(classifier, requests, args.iterations)
+    print(json.dumps(report, indent=2))
+    failed = report["label_mismatches"] or report["proba_label_mismatches"] or report["rows_over_tolerance"]
+    if failed:
+        print(f"❌ Scorer differs from sklearn on {len(set(report['label_mismatches']) | set(report['rows_over_tolerance']))}"
+              f" of {report['rows']} rows.")
+        return 1
+    print(f"✅ Identical labels on all {report['rows']} rows; probabilities within {args.tolerance:g}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+# kraya/httpclient.py
+# Minimal keep-alive asyncio HTTP/1.1 JSON client for the Kraya API (load tools).
+import asyncio
+import json
+
+
+class HTTPError(Exception):
+    pass
+
+
+class Connection:
+    def __init__(self, host="127.0.0.1", port=8000):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def _ensure(self):
+        if self._writer is None or self._writer.is_closing():
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        """Return (status, decoded body); JSON bodies are parsed, others returned as text."""
+        await self._ensure()
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        )
+        try:
+            self._writer.write(head.encode("latin-1") + body)
+            await self._writer.drain()
+            status_line = await self._reader.readline()
+            if not status_line:
+                raise HTTPError("Connection closed by server")
+            status = int(status_line.split()[1])
+            headers = {}
+            while True:
+                line = await self._reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            data = await self._reader.readexactly(int(headers.get("content-length", 0)))
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError, ValueError) as e:
+            await self.close()
+            raise HTTPError(str(e) or e.__class__.__name__) from e
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        text = data.decode("utf-8")
+        if headers.get("content-type", "").startswith("application/json"):
+            return status, json.loads(text) if text else None
+        return status, text
+
+    async def post(self, path, payload):
+        return await self.request("POST", path, payload)
+
+    async def get(self, path):
+        return await self.request("GET", path)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self._writer = None
+
+
+async def wait_until_ready(host, port, timeout=120.0):
+    """Poll GET /healthz until the server answers."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        conn = Connection(host, port)
+        try:
+            status, _ = await conn.get("/healthz")
+            if status == 200:
+                return True
+        except (OSError, HTTPError):
+            pass
+        finally:
+            await conn.close()
+        if loop.time() > deadline:
+            return False
+        await asyncio.sleep(0.25)
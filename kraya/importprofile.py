@@ -0,0 +1,87 @@
+# kraya/importprofile.py
+# Import-time profile of the app's startup, before vs after lazy loading.
+#
+# Each scenario runs in a fresh interpreter under `python -X importtime`;
+# the report lists total import time and the heaviest top-level packages.
+#
+#   eager  what the app used to do on every cold start: import
+#          sentence_transformers/torch at module top and load every model
+#          before the first paint
+#   lazy   what the app does now before the first paint: import interface
+#          only (models and heavy libraries load when their page is opened)
+#
+#   python -m kraya.importprofile [--top 15] [--scenario lazy]
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+SCENARIOS = {
+    "eager": (
+        "import streamlit, interface\n"
+        "from sentence_transformers import SentenceTransformer\n"
+        "from kraya import models\n"
+        "models.registry.warm_up(['food_classifier', 'fabric_recommender', 'electronics_data'])\n"
+    ),
+    "lazy": "import streamlit, interface\n",
+}
+
+
+def parse_importtime(stderr):
+    """{top-level package: cumulative seconds} from `-X importtime` output."""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        name = parts[2][1:]
+        # Nested imports are indented; their time is already in the parent's cumulative
+        if name.startswith(" "):
+            continue
+        totals[name.split(".")[0]] += int(parts[1]) / 1e6
+    return dict(totals)
+
+
+def profile(scenario):
+    code = SCENARIOS[scenario]
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        error = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        raise RuntimeError(f"{scenario} failed: {error[-1] if error else proc.returncode}")
+    packages = parse_importtime(proc.stderr)
+    return {"wall_s": wall, "import_s": sum(packages.values()), "packages": packages}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Startup import-time profile (before/after lazy loading).")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for scenario in args.scenario or ["eager", "lazy"]:
+        try:
+            results[scenario] = profile(scenario)
+        except RuntimeError as e:
+            print(f"⚠️ {e}", file=sys.stderr)
+
+    for scenario, result in results.items():
+        print(f"\n== {scenario}: {result['wall_s']:.2f}s wall, {result['import_s']:.2f}s in imports ==")
+        ranked = sorted(result["packages"].items(), key=lambda kv: -kv[1])[: args.top]
+        for name, seconds in ranked:
+            print(f"  {seconds * 1000:9.1f} ms  {name}")
+    if "eager" in results and "lazy" in results:
+        saved = results["eager"]["wall_s"] - results["lazy"]["wall_s"]
+        print(f"\nLazy startup saves {saved:.2f}s before first paint "
+              f"({results['lazy']['wall_s'] / results['eager']['wall_s']:.0%} of eager).")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+# kraya/index_builder.py
+# Batched, optionally multi-process embedding of the electronics KB.
+#
+# Texts are deduplicated, sorted by length (so each batch pads to similar
+# lengths) and cut into chunks of `batch_size`. Chunks are encoded in this
+# process or across a process pool – each worker loads the model once and
+# caps its torch threads – and every encoded chunk is written straight into
+# a memory-mapped .npy on disk, so memory stays bounded by the in-flight
+# chunks whatever the KB size. The row matrix is then gathered from the
+# unique vectors chunk by chunk into the index.
+#
+#   python -m kraya.index_builder --batch-size 64 --workers 4       # build + save the index
+#   python -m kraya.index_builder --sweep --batch-sizes 16,64,256 --worker-counts 1,2,4 --texts 20000
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from kraya.electronics_index import (
+    DEFAULT_JSON_PATH, MODEL_NAME, ElectronicsIndex, _normalize, content_hash, corpus_rows,
+)
+
+_model = None
+_outputs = {}
+
+
+def dedupe(texts):
+    """(unique texts, inverse) with texts == [unique[i] for i in inverse]."""
+    positions = {}
+    inverse = np.empty(len(texts), dtype=np.int64)
+    for row, text in enumerate(texts):
+        inverse[row] = positions.setdefault(text, len(positions))
+    return list(positions), inverse
+
+
+def length_chunks(texts, batch_size):
+    """Index arrays of `texts` in batches of similar length (longest first)."""
+    order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+    return [np.asarray(order[i:i + batch_size]) for i in range(0, len(order), batch_size)]
+
+
+def _encode(model, texts, batch_size):
+    vectors = model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    return _normalize(vectors)
+
+
+def _init_worker(model_name, threads):
+    global _model
+    from kraya.encoder import load_encoder
+    _model = load_encoder(model_name, "float32", threads=threads)
+
+
+def _ready():
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def _encode_chunk(out_path, positions, texts, batch_size):
+    out = _outputs.get(out_path)
+    if out is None:
+        _outputs.clear()
+        out = _outputs[out_path] = np.load(out_path, mmap_mode="r+")
+    out[positions] = _encode(_model, texts, batch_size)
+    return len(texts)
+
+
+def worker_pool(workers, model_name=MODEL_NAME):
+    """Process pool whose workers each hold one model (torch threads split between them)."""
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    # spawn, not fork: a forked torch/OpenMP runtime can deadlock in the children
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                               initializer=_init_worker, initargs=(model_name, threads))
+    for future in [pool.submit(_ready) for _ in range(workers * 2)]:
+        future.result()  # start every worker (and load its model) up front
+    return pool
+
+
+def encode_texts(texts, out_path=None, embed_model=None, batch_size=64, workers=1,
+                 model_name=MODEL_NAME, dim=None, pool=None):
+    """Encode `texts` (deduplicated) into normalized rows; returns (matrix, inverse).
+
+    With `out_path` the unique vectors go into a .npy memory map there (the
+    returned matrix is that map). `workers` > 1 needs `out_path` and encodes
+    in `pool` (or a temporary worker_pool) instead of with `embed_model`.
+    """
+    unique, inverse = dedupe(texts)
+    chunks = length_chunks(unique, batch_size)
+    if workers <= 1:
+        if embed_model is None:
+            from kraya.encoder import load_encoder
+            embed_model = load_encoder(model_name, "float32")
+        if not hasattr(embed_model, "encode"):
+            embed_model = embed_model()
+        dim = dim or embed_model.get_sentence_embedding_dimension()
+        out = (np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(len(unique), dim))
+               if out_path else np.empty((len(unique), dim), dtype=np.float32))
+        for positions in chunks:
+            out[positions] = _encode(embed_model, [unique[i] for i in positions], batch_size)
+        return out, inverse
+
+    if out_path is None:
+        raise ValueError("out_path is required with workers > 1")
+    if dim is None:
+        from kraya.encoder import load_encoder
+        dim = load_encoder(model_name, "float32").get_sentence_embedding_dimension()
+    out = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(len(unique), dim))
+    out.flush()
+    del out
+    own_pool = pool is None
+    if own_pool:
+        pool = worker_pool(workers, model_name)
+    try:
+        # Bounded window of in-flight chunks keeps the parent's memory flat
+        pending = deque()
+        for positions in chunks:
+            pending.append(pool.submit(_encode_chunk, out_path, positions,
+                                       [unique[i] for i in positions], batch_size))
+            if len(pending) >= workers * 2:
+                pending.popleft().result()
+        while pending:
+            pending.popleft().result()
+    finally:
+        if own_pool:
+            pool.shutdown()
+    return np.load(out_path, mmap_mode="r"), inverse
+
+
+def gather_rows(unique_vectors, inverse, out_path=None, chunk_rows=65536):
+    """Row matrix unique_vectors[inverse], written chunk by chunk (to `out_path` when given)."""
+    shape = (len(inverse), unique_vectors.shape[1])
+    rows = (np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=shape)
+            if out_path else np.empty(shape, dtype=np.float32))
+    for start in range(0, len(inverse), chunk_rows):
+        rows[start:start + chunk_rows] = unique_vectors[inverse[start:start + chunk_rows]]
+    return rows
+
+
+def build_index(items, embed_model=None, content_hash=None, batch_size=64, workers=1, scratch_dir=None):
+    """ElectronicsIndex over `items`; with `scratch_dir` vectors stream through disk."""
+    texts, row_item = corpus_rows(items)
+    unique_path = os.path.join(scratch_dir, "unique.npy") if scratch_dir else None
+    unique, inverse = encode_texts(texts, unique_path, embed_model, batch_size, workers)
+    rows_path = os.path.join(scratch_dir, "rows.npy") if scratch_dir else None
+    vectors = gather_rows(unique, inverse, rows_path)
+    return ElectronicsIndex(items, vectors, row_item, content_hash)
+
+
+# ---------------- THROUGHPUT SWEEP ---------------- #
+def synthetic_texts(items, count):
+    """`count` distinct KB-like texts (problems, example queries and rewrites)."""
+    from kraya.bench import query_variants
+
+    base = [v for text in corpus_rows(items)[0] for v in query_variants(text)]
+    return [base[i % len(base)] + (f" (case {i // len(base)})" if i >= len(base) else "") for i in range(count)]
+
+
+def sweep(texts, batch_sizes, worker_counts):
+    """texts/sec for every (batch size, worker count) pair, excluding model/worker start-up."""
+    from kraya.encoder import load_encoder
+
+    model = load_encoder(MODEL_NAME, "float32")
+    dim = model.get_sentence_embedding_dimension()
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for workers in worker_counts:
+            pool = worker_pool(workers) if workers > 1 else None
+            for batch_size in batch_sizes:
+                # A fresh file per run: workers cache the map of the last path they wrote
+                out_path = os.path.join(scratch, f"unique-{workers}-{batch_size}.npy")
+                t = time.perf_counter()
+                encode_texts(texts, out_path, model, batch_size, workers, dim=dim, pool=pool)
+                seconds = time.perf_counter() - t
+                os.remove(out_path)
+                results.append({
+                    "workers": workers,
+                    "batch_size": batch_size,
+                    "texts": len(set(texts)),
+                    "seconds": round(seconds, 3),
+                    "texts_per_s": round(len(set(texts)) / seconds, 1),
+                })
+                print(f"workers={workers:<3} batch={batch_size:<5} {results[-1]['texts_per_s']:>9.1f} texts/s",
+                      file=sys.stderr)
+            if pool is not None:
+                pool.shutdown()
+    return results
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batched (multi-process) electronics index builder.")
+    parser.add_argument("json_path", nargs="?", default=DEFAULT_JSON_PATH)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--sweep", action="store_true", help="report texts/sec instead of building")
+    parser.add_argument("--batch-sizes", default="8,32,64,128,256")
+    parser.add_argument("--worker-counts", default="1,2,4")
+    parser.add_argument("--texts", type=int, default=0, help="sweep over N synthetic texts (default: the KB)")
+    args = parser.parse_args(argv)
+
+    with open(args.json_path, "r") as f:
+        items = json.load(f)
+    if args.sweep:
+        texts = synthetic_texts(items, args.texts) if args.texts else corpus_rows(items)[0]
+        results = sweep(texts, [int(b) for b in args.batch_sizes.split(",")],
+                        [int(w) for w in args.worker_counts.split(",")])
+        print(json.dumps(results, indent=2))
+        return 0
+
+    digest = content_hash(args.json_path)
+    t = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(args.json_path) or ".") as scratch:
+        index = build_index(items, content_hash=digest, batch_size=args.batch_size,
+                            workers=args.workers, scratch_dir=scratch)
+        index.save(args.json_path)
+    seconds = time.perf_counter() - t
+    print(f"Built {len(index)} rows x {index.vectors.shape[1]} dims in {seconds:.1f}s ({digest[:12]}).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,198 @@
+# kraya/kb.py
+# Incremental updates of the electronics knowledge base by stable item id.
+#
+# Every KB entry carries an "id" (entries without one get a slug of device
+# and problem). A change set upserts or deletes entries by id; the new index
+# reuses the persisted vector of every text it already contains and embeds
+# only new or edited texts, then commits the index files and electronics.json
+# atomically (see ElectronicsIndex.save). Running processes pick the new
+# version up through the registry's reload watcher (KRAYA_RELOAD_INTERVAL),
+# which maps the new files without re-embedding anything.
+#
+#   python -m kraya.kb ids
+#   python -m kraya.kb upsert new_entries.json        # one entry or a list
+#   python -m kraya.kb delete tv/no-sound
+#   python -m kraya.kb apply changes.jsonl            # {"op": "upsert", "item": {...}}
+#                                                     # {"op": "delete", "id": "..."}
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from kraya.electronics_index import (
+    DEFAULT_JSON_PATH, MODEL_NAME, PRECISIONS, ElectronicsIndex, content_hash_bytes, corpus_rows,
+    device_key, index_paths,
+)
+from kraya.index_builder import encode_texts
+
+REQUIRED_FIELDS = ("device", "problem", "solution")
+
+
+class KBError(ValueError):
+    pass
+
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def item_id(item):
+    return item.get("id") or f"{slug(device_key(item['device']))}/{slug(item['problem'])}"
+
+
+def _validate(item):
+    if not isinstance(item, dict):
+        raise KBError("KB entry must be a JSON object")
+    missing = [name for name in REQUIRED_FIELDS if not str(item.get(name, "")).strip()]
+    if missing:
+        raise KBError(f"KB entry is missing {', '.join(missing)}")
+    queries = item.get("example_queries", [])
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        raise KBError("example_queries must be a list of strings")
+
+
+def apply_changes(items, changes):
+    """Return (new items, {added, updated, deleted}) after applying `changes` in order."""
+    items = list(items)
+    positions = {}
+    for i, item in enumerate(items):
+        key = item_id(item)
+        if key in positions:
+            raise KBError(f"Duplicate KB id '{key}'")
+        positions[key] = i
+    summary = {"added": [], "updated": [], "deleted": []}
+    for change in changes:
+        op = change.get("op")
+        if op == "upsert":
+            item = change.get("item")
+            _validate(item)
+            key = item_id(item)
+            item = dict(item, id=key)
+            if key in positions:
+                if items[positions[key]] != item:
+                    items[positions[key]] = item
+                    summary["updated"].append(key)
+            else:
+                positions[key] = len(items)
+                items.append(item)
+                summary["added"].append(key)
+        elif op == "delete":
+            key = change.get("id")
+            if key not in positions:
+                raise KBError(f"No KB entry with id '{key}'")
+            items[positions.pop(key)] = None
+            summary["deleted"].append(key)
+        else:
+            raise KBError(f"Unknown change op '{op}' (use 'upsert' or 'delete')")
+    return [item for item in items if item is not None], summary
+
+
+def patch_index(old_index, items, embed_model, digest, batch_size=64):
+    """Index over `items` reusing `old_index` vectors; returns (index, texts embedded)."""
+    texts, row_item = corpus_rows(items)
+    known = {}
+    if old_index is not None:
+        old_texts, _ = corpus_rows(old_index.items)
+        known = {text: row for row, text in enumerate(old_texts)}
+    missing = sorted({text for text in texts if text not in known})
+    fresh = {}
+    if missing:
+        encoded, _ = encode_texts(missing, embed_model=embed_model, batch_size=batch_size)
+        fresh = dict(zip(missing, encoded))
+    old_vectors = old_index.dense() if old_index is not None else None
+    if not texts:
+        raise KBError("The knowledge base cannot be empty")
+    vectors = np.stack([fresh[t] if t in fresh else old_vectors[known[t]] for t in texts])
+    return ElectronicsIndex(items, vectors, row_item, digest), len(missing)
+
+
+def _locked(json_path):
+    """Exclusive advisory lock serializing KB writers (no-op where fcntl is unavailable)."""
+    lock = open(os.path.splitext(json_path)[0] + "_index.lock", "a")
+    try:
+        import fcntl
+        fcntl.flock(lock, fcntl.LOCK_EX)
+    except ImportError:
+        pass
+    return lock
+
+
+def _write_json_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def ingest(changes, json_path=DEFAULT_JSON_PATH, embed_model=None):
+    """Apply a change set to the KB and its persisted indexes; returns a summary dict."""
+    if embed_model is None:
+        from kraya.encoder import load_encoder
+        embed_model = lambda: load_encoder(MODEL_NAME, "float32")
+    started = time.perf_counter()
+    with _locked(json_path):
+        with open(json_path, "rb") as f:
+            raw = f.read()
+        items = json.loads(raw)
+        old_index = ElectronicsIndex.load(json_path, items, expected_hash=content_hash_bytes(raw))
+
+        new_items, summary = apply_changes(items, changes)
+        new_raw = (json.dumps(new_items, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+        if new_raw == raw:
+            return dict(summary, embedded=0, rows=len(old_index) if old_index else None, seconds=0.0)
+        digest = content_hash_bytes(new_raw)
+        index, embedded = patch_index(old_index, new_items, embed_model, digest)
+
+        # Index versions first, electronics.json last: watchers reload on the
+        # JSON change and then find a matching index already committed
+        index.save(json_path)
+        for precision in PRECISIONS[1:]:
+            if os.path.exists(index_paths(json_path, precision)["meta"]):
+                index.quantized(precision).save(json_path)
+        _write_json_atomic(json_path, new_raw)
+    return dict(summary, embedded=embedded, rows=len(index), content_hash=digest[:12],
+                seconds=round(time.perf_counter() - started, 3))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incrementally update the electronics knowledge base.")
+    parser.add_argument("--json", default=DEFAULT_JSON_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("ids", help="list entry ids")
+    upsert = sub.add_parser("upsert", help="add or replace entries from a JSON file (object or list)")
+    upsert.add_argument("path")
+    delete = sub.add_parser("delete", help="delete entries by id")
+    delete.add_argument("ids", nargs="+")
+    apply = sub.add_parser("apply", help="apply a JSONL change set")
+    apply.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "ids":
+        with open(args.json) as f:
+            for item in json.load(f):
+                print(item_id(item))
+        return 0
+    if args.command == "upsert":
+        with open(args.path) as f:
+            entries = json.load(f)
+        changes = [{"op": "upsert", "item": e} for e in (entries if isinstance(entries, list) else [entries])]
+    elif args.command == "delete":
+        changes = [{"op": "delete", "id": key} for key in args.ids]
+    else:
+        with open(args.path) as f:
+            changes = [json.loads(line) for line in f if line.strip()]
+    try:
+        summary = ingest(changes, args.json)
+    except KBError as e:
+        print(f"❌ {e}")
+        return 1
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+# kraya/lexical.py
+# Per-device BM25 first stage for electronics support.
+#
+# Each KB item is one document made of its problem, example queries and
+# category. Postings are kept per device, so a query only touches the
+# postings of its own tokens on its own device – a few microseconds for the
+# bundled KB. Besides the BM25 ranking, search() returns a confidence in
+# [0, 1]: the share of the query's IDF mass that the best item covers, or 0
+# when another candidate covers as much (an ambiguous match). Query tokens
+# never seen on the device count with the highest IDF, so vocabulary the KB
+# doesn't know pulls the confidence down.
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from kraya.electronics_index import device_key
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it its my me "
+    "no not of on or our so the their them then there this to too was we what when why will "
+    "with you your help please "
+    # Contractions as _TOKEN splits them: won't -> won, t; it's -> it, s; ...
+    "won don doesn didn isn wasn aren couldn wouldn haven hasn t s ll ve re d m".split()
+)
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords, with a light plural strip."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def item_text(item):
+    return " ".join([item["problem"]] + item.get("example_queries", []) + [item.get("category", "")])
+
+
+class _DeviceIndex:
+    def __init__(self, item_ids, docs, k1, b):
+        self.item_ids = np.asarray(item_ids, dtype=np.int64)
+        lengths = np.array([len(d) for d in docs], dtype=np.float32)
+        avg = float(lengths.mean()) if len(docs) and lengths.mean() > 0 else 1.0
+        norm = k1 * (1 - b + b * lengths / avg)
+        df = Counter(t for d in docs for t in set(d))
+        n = len(docs)
+        self.idf = {t: math.log(1 + (n - f + 0.5) / (f + 0.5)) for t, f in df.items()}
+        self.max_idf = math.log(1 + (n + 0.5) / 0.5)
+        self.postings = {}
+        per_token = defaultdict(list)
+        for doc, tokens in enumerate(docs):
+            for token, tf in Counter(tokens).items():
+                per_token[token].append((doc, tf))
+        for token, entries in per_token.items():
+            docs_arr = np.array([d for d, _ in entries], dtype=np.int64)
+            tf = np.array([c for _, c in entries], dtype=np.float32)
+            # Precomputed BM25 term weight per posting
+            self.postings[token] = (docs_arr, self.idf[token] * tf * (k1 + 1) / (tf + norm[docs_arr]))
+
+
+class LexicalIndex:
+    def __init__(self, items, k1=1.2, b=0.75):
+        by_device = defaultdict(list)
+        for i, item in enumerate(items):
+            by_device[device_key(item["device"])].append(i)
+        self.devices = {
+            key: _DeviceIndex(ids, [tokenize(item_text(items[i])) for i in ids], k1, b)
+            for key, ids in by_device.items()
+        }
+
+    def search(self, query, device, k=10):
+        """([(item index, bm25 score)] best first, confidence of the top item)."""
+        index = self.devices.get(device_key(device))
+        tokens = set(tokenize(query))
+        if index is None or not tokens:
+            return [], 0.0
+        scores = np.zeros(len(index.item_ids), dtype=np.float32)
+        covered = np.zeros(len(index.item_ids), dtype=np.float32)
+        total = 0.0
+        for token in tokens:
+            idf = index.idf.get(token, index.max_idf)
+            total += idf
+            posting = index.postings.get(token)
+            if posting is not None:
+                docs, weights = posting
+                scores[docs] += weights
+                covered[docs] += idf
+        hits = np.flatnonzero(scores > 0)
+        if hits.size == 0:
+            return [], 0.0
+        order = hits[np.argsort(-scores[hits], kind="stable")][:k]
+        candidates = [(int(index.item_ids[d]), float(scores[d])) for d in order]
+        best = covered[order[0]]
+        if (covered[hits] >= best).sum() > 1 or not total:
+            return candidates, 0.0
+        return candidates, float(best / total)
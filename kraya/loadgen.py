@@ -0,0 +1,279 @@
+# kraya/loadgen.py
+# Concurrent-session load generator for the Kraya API.
+#
+# Each simulated user is one keep-alive connection that walks the app the
+# way show_ui is used: land on Home, pick a page by the configured mix, run
+# one or more analyses there with think time in between, go back Home.
+# Inputs come from the bundled datasets (the bench workloads). The user
+# count steps through --users, each step running for --duration seconds, while
+# a sampler records the server's CPU and RSS (parent plus pre-forked workers)
+# over time. The report gives per-step throughput, error rate and latency
+# percentiles per page action. The saturation point is the first step whose
+# throughput grows by less than --saturation-gain over the previous step.
+#
+#   python -m kraya.loadgen --users 1,4,16,64 --duration 20               # spawns one server process
+#   python -m kraya.loadgen --users 8,32 --think 0.5 --mix food=5,electronics=3,fabric=1,home=1
+#   python -m kraya.loadgen --attach --port 8000 --server-pid 4242        # an already running server
+#
+# "home" is GET /healthz: Home runs no model, so it stands in for the page
+# load that precedes every flow.
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+from kraya import procstats
+from kraya.bench import PATHS, ROUTES, WORKLOADS
+from kraya.httpclient import Connection, HTTPError, wait_until_ready
+from kraya.stats import summarize
+
+ACTIONS = ("home",) + PATHS
+DEFAULT_MIX = {"home": 1, "food": 3, "electronics": 3, "fabric": 2}
+
+
+def parse_mix(text):
+    """'food=3,fabric=1' -> {"food": 3.0, "fabric": 1.0}; unknown actions are an error."""
+    mix = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ACTIONS:
+            raise ValueError(f"Unknown action '{name}' (use {', '.join(ACTIONS)})")
+        mix[name] = float(weight or 1)
+    if not any(w > 0 for w in mix.values()):
+        raise ValueError("The page mix needs at least one positive weight")
+    return mix
+
+
+def dataset_payloads(limit=None):
+    """{page: [JSON payload]} drawn from the bundled datasets."""
+    from dataclasses import asdict
+
+    return {path: [asdict(r) for r in WORKLOADS[path](limit)] for path in PATHS}
+
+
+# ---------------- SERVER SAMPLES ---------------- #
+class ServerSampler:
+    """CPU (% of one core) and RSS of a server process and its workers, every `interval` seconds."""
+
+    def __init__(self, pid, interval=1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._last = None
+
+    def _read(self):
+        pids = [self.pid] + procstats.children(self.pid)
+        cpu = sum(procstats.cpu_seconds(p) or 0.0 for p in pids)
+        rss = sum(procstats.memory(p).get("rss", 0) for p in pids)
+        return time.perf_counter(), cpu, rss, len(pids) - 1
+
+    def sample(self, started, users):
+        now, cpu, rss, workers = self._read()
+        if self._last is not None:
+            wall = now - self._last[0]
+            self.samples.append({
+                "t": round(now - started, 2),
+                "users": users,
+                "cpu_percent": round(100 * (cpu - self._last[1]) / wall, 1) if wall > 0 else None,
+                "rss_mb": round(rss / 2**20, 1),
+                "workers": workers,
+            })
+        self._last = (now, cpu, rss)
+
+    async def run(self, started, users, stop):
+        while not stop.is_set():
+            self.sample(started, users())
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# ---------------- SIMULATED USERS ---------------- #
+class Step:
+    def __init__(self, users):
+        self.users = users
+        self.latencies = {name: [] for name in ACTIONS}
+        self.errors = {name: 0 for name in ACTIONS}
+        self.started = self.ended = None
+
+    def record(self, action, seconds, ok):
+        self.latencies[action].append(seconds)
+        if not ok:
+            self.errors[action] += 1
+
+    def report(self, samples=()):
+        elapsed = (self.ended - self.started) if self.started is not None else 0.0
+        done = sum(len(v) for v in self.latencies.values())
+        errors = sum(self.errors.values())
+        cpu = [s["cpu_percent"] for s in samples if s["cpu_percent"] is not None]
+        return {
+            "users": self.users,
+            "seconds": round(elapsed, 2),
+            "requests": done,
+            "throughput_rps": round(done / elapsed, 1) if elapsed > 0 else None,
+            "error_rate": round(errors / done, 4) if done else None,
+            "actions": {
+                name: dict(summarize(lat), errors=self.errors[name],
+                           throughput_rps=round(len(lat) / elapsed, 1) if elapsed > 0 else None)
+                for name, lat in self.latencies.items() if lat or self.errors[name]
+            },
+            "server_cpu_percent_mean": round(sum(cpu) / len(cpu), 1) if cpu else None,
+            "server_cpu_percent_max": max(cpu) if cpu else None,
+            "server_rss_mb_max": max((s["rss_mb"] for s in samples), default=None),
+        }
+
+
+async def _user(host, port, payloads, mix, think, actions_per_page, step, deadline, rng):
+    loop = asyncio.get_running_loop()
+    pages = [name for name in mix if name != "home" and mix[name] > 0]
+    weights = [mix[name] for name in pages]
+    conn = Connection(host, port)
+
+    async def act(action):
+        t = time.perf_counter()
+        try:
+            if action == "home":
+                status, _ = await conn.get("/healthz")
+            else:
+                status, _ = await conn.post(ROUTES[action], rng.choice(payloads[action]))
+        except (HTTPError, OSError):
+            status = 0
+        if loop.time() < deadline:
+            step.record(action, time.perf_counter() - t, status == 200)
+
+    async def pause():
+        if think > 0:
+            await asyncio.sleep(min(rng.expovariate(1 / think), max(0.0, deadline - loop.time())))
+
+    try:
+        while loop.time() < deadline:
+            if mix.get("home", 0) > 0:
+                await act("home")
+                await pause()
+            if not pages:
+                continue
+            page = rng.choices(pages, weights)[0]
+            for _ in range(rng.randint(1, actions_per_page)):
+                if loop.time() >= deadline:
+                    break
+                await act(page)
+                await pause()
+    finally:
+        await conn.close()
+
+
+async def run_steps(host, port, user_counts, duration, mix, think=1.0, actions_per_page=3,
+                    server_pid=None, sample_interval=1.0, seed=0):
+    """Run each user count for `duration` seconds; returns (step reports, server samples)."""
+    payloads = dataset_payloads()
+    rng = random.Random(seed)
+    sampler = ServerSampler(server_pid, sample_interval) if server_pid else None
+    started = time.perf_counter()
+    current = {"users": 0}
+    stop = asyncio.Event()
+    sampling = asyncio.ensure_future(sampler.run(started, lambda: current["users"], stop)) if sampler else None
+    reports = []
+    try:
+        for users in user_counts:
+            current["users"] = users
+            step = Step(users)
+            first = len(sampler.samples) if sampler else 0
+            loop = asyncio.get_running_loop()
+            step.started = time.perf_counter()
+            deadline = loop.time() + duration
+            await asyncio.gather(*(
+                _user(host, port, payloads, mix, think, actions_per_page, step, deadline,
+                      random.Random(rng.random()))
+                for _ in range(users)
+            ))
+            step.ended = time.perf_counter()
+            reports.append(step.report(sampler.samples[first:] if sampler else ()))
+            print(f"users={users:<5} {reports[-1]['throughput_rps'] or 0:>9.1f} req/s  "
+                  f"errors={reports[-1]['error_rate'] or 0:.2%}", file=sys.stderr)
+    finally:
+        stop.set()
+        if sampling is not None:
+            await sampling
+    return reports, sampler.samples if sampler else []
+
+
+def saturation(reports, min_gain=0.1):
+    """User count of the first step whose throughput grew by less than `min_gain` (None if none)."""
+    for prev, cur in zip(reports, reports[1:]):
+        if prev["throughput_rps"] and cur["throughput_rps"] is not None:
+            if cur["throughput_rps"] < prev["throughput_rps"] * (1 + min_gain):
+                return {"users": prev["users"], "throughput_rps": prev["throughput_rps"],
+                        "next_users": cur["users"], "next_throughput_rps": cur["throughput_rps"]}
+    return None
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Concurrent-session load generator for the Kraya API.")
+    parser.add_argument("--users", default="1,2,4,8,16,32,64", help="comma-separated concurrent user counts")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per user count")
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time between actions (s, 0 = none)")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help="page weights, e.g. food=3,electronics=3,fabric=2,home=1")
+    parser.add_argument("--actions-per-page", type=int, default=3, help="max analyses per page visit")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--attach", action="store_true", help="load a running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="pid to sample CPU/RSS from with --attach")
+    parser.add_argument("--workers", type=int, default=0, help="--workers of the started server (0 = one process)")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--saturation-gain", type=float, default=0.1,
+                        help="throughput growth below which a step counts as saturated")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    user_counts = [int(n) for n in args.users.split(",") if n.strip()]
+
+    proc = None
+    server_pid = args.server_pid
+    if not args.attach:
+        proc = subprocess.Popen([sys.executable, "-m", "kraya.server", "--port", str(args.port),
+                                 "--host", args.host, "--workers", str(args.workers)],
+                                stdout=subprocess.DEVNULL)
+        server_pid = proc.pid
+    try:
+        if not asyncio.run(wait_until_ready(args.host, args.port)):
+            print(f"❌ No server answering on {args.host}:{args.port}", file=sys.stderr)
+            return 1
+        reports, samples = asyncio.run(run_steps(
+            args.host, args.port, user_counts, args.duration, mix, args.think, args.actions_per_page,
+            server_pid, args.sample_interval, args.seed,
+        ))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    report = {
+        "config": {"mix": mix, "think_s": args.think, "duration_s": args.duration,
+                   "workers": args.workers if proc is not None else None},
+        "steps": reports,
+        "saturation": saturation(reports, args.saturation_gain),
+        "server": samples,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+# kraya/metrics.py
+# Hot-path instrumentation: timing spans, histograms and counters.
+#
+#   with metrics.span("encode", page="electronics"):
+#       ...
+#   metrics.inc("fallback_total", page="electronics")
+#
+# Spans feed the `kraya_stage_seconds` histogram (labelled by stage and
+# page); counters are `kraya_<name>`. Everything is exported as Prometheus
+# text (GET /metrics on the API server, or a standalone exporter thread for
+# the Streamlit process) and/or as a periodic structured JSON log line.
+# When disabled (the default, see KRAYA_METRICS) span() returns a shared
+# no-op object and inc()/observe() return immediately.
+import json
+import logging
+import threading
+import time
+
+from kraya import config
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = config.METRICS
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+_counters = {}    # (name, labels) -> value
+_log = logging.getLogger("kraya.metrics")
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+# ---------------- RECORDING ---------------- #
+def observe(name, seconds, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+                break
+        else:
+            hist[len(BUCKETS)] += 1
+        hist[-1] += seconds
+
+
+def inc(name, value=1, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class _Span:
+    __slots__ = ("stage", "labels", "start")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe("stage_seconds", time.perf_counter() - self.start, stage=self.stage, **self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage, **labels):
+    """Context manager timing one stage of a hot path."""
+    if not _enabled:
+        return _NOOP
+    return _Span(stage, labels)
+
+
+# ---------------- EXPORT ---------------- #
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        histograms = {k: list(v) for k, v in _histograms.items()}
+        counters = dict(_counters)
+    lines = []
+    for name in sorted({k[0] for k in counters}):
+        lines.append(f"# TYPE kraya_{name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"kraya_{name}{_label_text(labels)} {value}")
+    for name in sorted({k[0] for k in histograms}):
+        lines.append(f"# TYPE kraya_{name} histogram")
+        for (n, labels), hist in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, hist):
+                cumulative += count
+                lines.append(f"kraya_{name}_bucket{_label_text(labels, [('le', bound)])} {cumulative}")
+            cumulative += hist[len(BUCKETS)]
+            lines.append(f"kraya_{name}_bucket{_label_text(labels, [('le', '+Inf')])} {cumulative}")
+            lines.append(f"kraya_{name}_sum{_label_text(labels)} {hist[-1]:.6f}")
+            lines.append(f"kraya_{name}_count{_label_text(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot():
+    """Compact dict view: counters, and count/mean per histogram series."""
+    with _lock:
+        histograms = {k: list(v) for k, v in _histograms.items()}
+        counters = dict(_counters)
+    fmt = lambda name, labels: name + "".join(f"|{k}={v}" for k, v in labels)
+    snap = {"counters": {fmt(n, l): v for (n, l), v in counters.items()}, "histograms": {}}
+    for (n, l), hist in histograms.items():
+        count = sum(hist[:-1])
+        snap["histograms"][fmt(n, l)] = {
+            "count": count,
+            "mean_ms": round(hist[-1] / count * 1000, 3) if count else None,
+        }
+    return snap
+
+
+_exporters = {}
+
+
+def start_log_exporter(interval_seconds=60.0):
+    """Log a JSON snapshot every `interval_seconds` (once per process)."""
+    if "log" in _exporters:
+        return _exporters["log"]
+
+    def run():
+        while True:
+            time.sleep(interval_seconds)
+            _log.info(json.dumps({"ts": round(time.time(), 3), "kraya_metrics": snapshot()}))
+
+    thread = threading.Thread(target=run, name="kraya-metrics-log", daemon=True)
+    thread.start()
+    _exporters["log"] = thread
+    return thread
+
+
+def start_http_exporter(port, host="0.0.0.0"):
+    """Serve GET /metrics on a background thread (for processes without the API server)."""
+    if "http" in _exporters:
+        return _exporters["http"]
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200 if self.path.startswith("/metrics") else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, name="kraya-metrics-http", daemon=True)
+    thread.start()
+    _exporters["http"] = server
+    return server
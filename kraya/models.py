@@ -0,0 +1,126 @@
+# kraya/models.py
+# The artifacts app.py serves, registered in the shared process-wide registry.
+import json
+import os
+import pickle
+
+from kraya import config
+from kraya.registry import registry
+
+# Pickle-free artifacts (kraya.artifacts) are preferred over the pickles below.
+FOOD_ARTIFACT_DIR = "food/artifact"
+FABRIC_ARTIFACT_DIR = "fabric/artifact"
+
+# Structured {model, vectorizer, scaler} bundle saved by the training notebook;
+# preferred over the legacy text-only model + vectorizer pair when present.
+FOOD_BUNDLE_PATH = "food/food_model.pkl"
+FOOD_MODEL_PATH = "food/food_weight_model_final.pkl"
+FOOD_VECTORIZER_PATH = "food/tfidf_vectorizer_final.pkl"
+FABRIC_MODEL_PATH = "fabric/fabric_model.pkl"
+ELECTRONICS_JSON_PATH = "electronics/electronics.json"
+EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+# ---------------- LOADERS ---------------- #
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _load_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _load_embed_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBED_MODEL_NAME)
+
+
+def _load_query_encoder():
+    # KB vectors always come from the float32 model; only queries use the runtime
+    if config.EMBED_RUNTIME == "float32":
+        return get("embed_model")
+    from kraya.encoder import load_encoder
+    return load_encoder(EMBED_MODEL_NAME, config.EMBED_RUNTIME, config.EMBED_ONNX_FILE)
+
+
+def _load_electronics_index():
+    from kraya.electronics_index import ElectronicsIndex
+    # The float32 model is only loaded if the persisted index has to be rebuilt
+    return ElectronicsIndex.load_or_build(
+        ELECTRONICS_JSON_PATH, lambda: get("embed_model"), get("electronics_data"),
+        backend=config.ELECTRONICS_BACKEND, backend_options=config.ELECTRONICS_BACKEND_OPTIONS,
+        precision=config.ELECTRONICS_VECTORS,
+    )
+
+
+def _load_food_classifier():
+    from kraya.food import FoodClassifier
+    if os.path.isdir(FOOD_ARTIFACT_DIR):
+        from kraya.artifacts import load_food_artifact
+        return load_food_artifact(FOOD_ARTIFACT_DIR)
+    if os.path.exists(FOOD_BUNDLE_PATH):
+        return FoodClassifier.from_bundle(_load_pickle(FOOD_BUNDLE_PATH))
+    return FoodClassifier(get("food_model"), get("food_vectorizer"))
+
+
+def _load_fabric_recommender():
+    from kraya.fabric import FabricRecommender
+    if os.path.isdir(FABRIC_ARTIFACT_DIR):
+        from kraya.artifacts import load_fabric_artifact
+        return load_fabric_artifact(FABRIC_ARTIFACT_DIR)
+    if not os.path.exists(FABRIC_MODEL_PATH):
+        raise FileNotFoundError(
+            f"No fabric model: build it with 'python -m kraya.artifacts build-fabric' "
+            f"(neither {FABRIC_ARTIFACT_DIR}/ nor {FABRIC_MODEL_PATH} exists)"
+        )
+    return FabricRecommender(get("fabric_model"))
+
+
+def _load_electronics_retriever():
+    from kraya.electronics import ElectronicsRetriever
+    return ElectronicsRetriever(get("electronics_index"), get("query_encoder"))
+
+
+registry.register("food_model", lambda: _load_pickle(FOOD_MODEL_PATH), [FOOD_MODEL_PATH])
+registry.register("food_vectorizer", lambda: _load_pickle(FOOD_VECTORIZER_PATH), [FOOD_VECTORIZER_PATH])
+registry.register("fabric_model", lambda: _load_pickle(FABRIC_MODEL_PATH), [FABRIC_MODEL_PATH])
+registry.register("electronics_data", lambda: _load_json(ELECTRONICS_JSON_PATH), [ELECTRONICS_JSON_PATH])
+registry.register("embed_model", _load_embed_model)
+registry.register("query_encoder", _load_query_encoder)
+registry.register("electronics_index", _load_electronics_index, [ELECTRONICS_JSON_PATH])
+registry.register("food_classifier", _load_food_classifier, [
+    FOOD_ARTIFACT_DIR + "/manifest.json", FOOD_BUNDLE_PATH, FOOD_MODEL_PATH, FOOD_VECTORIZER_PATH,
+])
+registry.register("fabric_recommender", _load_fabric_recommender, [
+    FABRIC_ARTIFACT_DIR + "/manifest.json", FABRIC_MODEL_PATH,
+])
+registry.register("electronics_retriever", _load_electronics_retriever, [ELECTRONICS_JSON_PATH])
+
+
+# Warm-up order after first paint: cheapest pages first
+WARMUP_ORDER = ["fabric_recommender", "food_classifier", "electronics_retriever"]
+
+
+# ---------------- ACCESS ---------------- #
+def get(name):
+    return registry.get(name)
+
+
+def start_warmup():
+    return registry.start_warmup(WARMUP_ORDER)
+
+
+def start_reload_watcher():
+    if config.RELOAD_INTERVAL > 0:
+        return registry.start_watcher(config.RELOAD_INTERVAL)
+    return None
+
+
+def get_or_none(name):
+    """Like get(), but returns None when the artifact fails to load."""
+    try:
+        return registry.get(name)
+    except Exception:
+        return None
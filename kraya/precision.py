@@ -0,0 +1,174 @@
+# kraya/precision.py
+# Accuracy/latency/memory check of reduced-precision electronics inference.
+#
+# Every variant is an (encoder runtime, index precision) pair, see
+# kraya.encoder and ElectronicsIndex.quantized. Each runs in a fresh process
+# and embeds every `example_queries` entry of electronics.json; its top-1
+# item per query must equal the float32/float32 reference. The report also
+# gives per-query encode and search latency, index size, encoder weight size
+# and process RSS, with ratios against the reference.
+#
+#   python -m kraya.precision                           # default variants
+#   python -m kraya.precision --variants int8/int8,onnx/float16
+#
+# Exits with status 1 when any variant changes a top-1 match, or fails to run
+# (missing onnx/torch, export error) unless --allow-skip is given.
+import json
+import subprocess
+import sys
+import time
+
+from kraya.stats import summarize
+
+REFERENCE = "float32/float32"
+DEFAULT_VARIANTS = ("float32/float16", "float32/int8", "int8/float32", "int8/int8", "onnx/float32")
+
+
+def example_queries(items):
+    """[(device, query, expected item index)] for every example query in the KB."""
+    return [(item["device"], q, i) for i, item in enumerate(items) for q in item.get("example_queries", [])]
+
+
+def measure_variant(variant, json_path, iterations=200):
+    """Run one variant in this process; returns its JSON-serializable result."""
+    import numpy as np
+    from kraya import procstats
+    from kraya.electronics_index import MODEL_NAME, ElectronicsIndex
+    from kraya.encoder import load_encoder, parameter_bytes
+
+    runtime, precision = variant.split("/")
+    with open(json_path) as f:
+        items = json.load(f)
+    started = time.perf_counter()
+    index = ElectronicsIndex.load_or_build(
+        json_path, lambda: load_encoder(MODEL_NAME, "float32"), items, precision=precision
+    )
+    encoder = load_encoder(MODEL_NAME, runtime)
+    load_s = time.perf_counter() - started
+
+    queries = example_queries(items)
+    encode = lambda texts: np.asarray(
+        encoder.encode(texts, convert_to_numpy=True, show_progress_bar=False), dtype=np.float32
+    )
+    vectors = encode([q for _, q, _ in queries])
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    top1 = []
+    for (device, _, _), vec in zip(queries, vectors):
+        item, _ = index.best_match(vec, device)
+        top1.append(items.index(item) if item is not None else None)
+
+    encode_lat, search_lat = [], []
+    for i in range(iterations):
+        device, text, _ = queries[i % len(queries)]
+        t = time.perf_counter()
+        vec = encode([text])[0]
+        encode_lat.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        index.top_k(vec / np.linalg.norm(vec), device)
+        search_lat.append(time.perf_counter() - t)
+
+    weights = parameter_bytes(encoder)
+    return {
+        "top1": top1,
+        "expected_hits": sum(got == want for got, (_, _, want) in zip(top1, queries)),
+        "load_s": round(load_s, 3),
+        "encode": summarize(encode_lat),
+        "search": summarize(search_lat),
+        "index_kb": round(index.nbytes / 2**10, 1),
+        "encoder_weights_mb": round(weights / 2**20, 1) if weights else None,
+        "rss_mb": round(procstats.memory().get("rss", 0) / 2**20, 1),
+    }
+
+
+def run_isolated(variant, json_path, iterations):
+    cmd = [sys.executable, "-m", "kraya.precision", "--worker", variant,
+           "--json", json_path, "--iterations", str(iterations)]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _ratio(new, old):
+    return round(new / old, 3) if new is not None and old else None
+
+
+def compare(reference, result, queries):
+    """Top-1 agreement and resource ratios of `result` against `reference`."""
+    mismatches = [
+        {"device": device, "query": text, "reference": ref, "got": got}
+        for (device, text, _), ref, got in zip(queries, reference["top1"], result["top1"])
+        if ref != got
+    ]
+    return {
+        "top1_agreement": round(1 - len(mismatches) / len(queries), 4) if queries else None,
+        "mismatches": mismatches,
+        "encode_p50_ratio": _ratio(result["encode"]["p50_ms"], reference["encode"]["p50_ms"]),
+        "search_p50_ratio": _ratio(result["search"]["p50_ms"], reference["search"]["p50_ms"]),
+        "index_ratio": _ratio(result["index_kb"], reference["index_kb"]),
+        "encoder_weights_ratio": _ratio(result["encoder_weights_mb"], reference["encoder_weights_mb"]),
+        "rss_ratio": _ratio(result["rss_mb"], reference["rss_mb"]),
+    }
+
+
+def main(argv=None):
+    import argparse
+    from kraya.electronics_index import DEFAULT_JSON_PATH
+
+    parser = argparse.ArgumentParser(description="Check reduced-precision electronics inference.")
+    parser.add_argument("--variants", default=",".join(DEFAULT_VARIANTS),
+                        help="comma-separated runtime/precision pairs")
+    parser.add_argument("--json", default=DEFAULT_JSON_PATH)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="also write the JSON report here")
+    parser.add_argument("--allow-skip", action="store_true",
+                        help="do not fail when a variant cannot run (it is reported as skipped)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure_variant(args.worker, args.json, args.iterations)))
+        return 0
+
+    with open(args.json) as f:
+        queries = example_queries(json.load(f))
+    print(f"⏱️  {REFERENCE} (reference) ...", file=sys.stderr)
+    reference = run_isolated(REFERENCE, args.json, args.iterations)
+    if "error" in reference:
+        print(f"❌ reference failed: {reference['error']}", file=sys.stderr)
+        return 1
+    report = {REFERENCE: {k: v for k, v in reference.items() if k != "top1"}}
+    changed, skipped, compared = [], [], []
+    for variant in [v.strip() for v in args.variants.split(",") if v.strip()]:
+        print(f"⏱️  {variant} ...", file=sys.stderr)
+        result = run_isolated(variant, args.json, args.iterations)
+        if "error" in result:
+            report[variant] = result
+            skipped.append(variant)
+            continue
+        compared.append(variant)
+        comparison = compare(reference, result, queries)
+        report[variant] = dict({k: v for k, v in result.items() if k != "top1"}, **comparison)
+        if comparison["mismatches"]:
+            changed.append(variant)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    for variant in skipped:
+        mark = "⚠️" if args.allow_skip else "❌"
+        print(f"{mark} {variant} did not run: {report[variant]['error']}", file=sys.stderr)
+    for variant in changed:
+        print(f"❌ {variant} changes {len(report[variant]['mismatches'])} top-1 match(es)", file=sys.stderr)
+    unchanged = [v for v in compared if v not in changed]
+    if unchanged:
+        print(f"✅ Top-1 matches unchanged on all {len(queries)} example queries for: {', '.join(unchanged)}.",
+              file=sys.stderr)
+    failed = changed or (skipped and not args.allow_skip) or not compared
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
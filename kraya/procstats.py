@@ -0,0 +1,54 @@
+# kraya/procstats.py
+# Per-process CPU and memory readings from /proc (Linux), for benchmarks.
+#
+# RSS counts shared pages in every process that maps them; PSS divides them
+# between the sharers, so the sum of worker PSS is the real memory cost of a
+# pre-forked deployment.
+import os
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def memory(pid="self"):
+    """{"rss", "pss", "shared", "private"} in bytes (empty dict if unavailable)."""
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared",
+              "Private_Clean": "private", "Private_Dirty": "private"}
+    result = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    name = fields[key]
+                    result[name] = result.get(name, 0) + int(rest.split()[0]) * 1024
+    except (OSError, ValueError):
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                result["rss"] = int(f.read().split()[1]) * _PAGE
+        except (OSError, ValueError, IndexError):
+            pass
+    return result
+
+
+def cpu_seconds(pid="self"):
+    """User + system CPU time of a process (None if unavailable)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Fields after the parenthesised command name; utime/stime are 14th/15th overall
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / _TICKS
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def children(pid):
+    """Direct child pids of `pid`."""
+    pids = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                pids.extend(int(p) for p in f.read().split())
+    except OSError:
+        pass
+    return pids
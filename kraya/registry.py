@@ -0,0 +1,211 @@
+# kraya/registry.py
+# Process-wide model registry.
+#
+# Streamlit re-executes app.py on every widget interaction for every session,
+# but imported modules live for the whole process. Artifacts registered here
+# are loaded lazily on first use, exactly once per process (thread-safe), and
+# shared by all sessions. Load time and resident memory are recorded per
+# artifact, and artifacts can be hot reloaded when their files change –
+# explicitly, or by a watcher thread polling the watched files.
+import logging
+import os
+import threading
+import time
+
+from kraya import metrics
+
+_log = logging.getLogger("kraya.registry")
+
+
+class ModelUnavailable(RuntimeError):
+    """An artifact's loader failed (missing file, missing dependency, corrupt artifact)."""
+
+    def __init__(self, name, cause):
+        super().__init__(f"{name} could not be loaded: {cause!r}")
+        self.name = name
+        self.cause = cause
+
+
+def current_rss():
+    """Resident set size of this process in bytes (0 if unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            # ru_maxrss is a peak value (KiB on Linux) – better than nothing
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except Exception:
+            return 0
+
+
+def _mtimes(paths):
+    stamps = {}
+    for path in paths:
+        try:
+            stamps[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            stamps[path] = None
+    return stamps
+
+
+class _Entry:
+    def __init__(self, name, loader, paths):
+        self.name = name
+        self.loader = loader
+        self.paths = tuple(paths)
+        self.lock = threading.RLock()
+        self.value = None
+        self.loaded = False
+        self.load_seconds = None
+        self.rss_bytes = None
+        self.loaded_at = None
+        self.mtimes = {}
+        self.loads = 0
+        self.last_error = None
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._warmup_thread = None
+        self._watcher_thread = None
+
+    def register(self, name, loader, paths=()):
+        """Register a zero-argument `loader`; `paths` are watched for hot reload."""
+        with self._lock:
+            self._entries[name] = _Entry(name, loader, paths)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def _entry(self, name):
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Unknown artifact '{name}'") from None
+
+    def _load(self, entry):
+        rss_before = current_rss()
+        start = time.perf_counter()
+        try:
+            with metrics.span("model_load", artifact=entry.name):
+                value = entry.loader()
+        except Exception as e:
+            # Failures are not cached so the next get() retries
+            entry.last_error = e
+            if isinstance(e, ModelUnavailable):
+                raise
+            raise ModelUnavailable(entry.name, e) from e
+        entry.value = value
+        entry.loaded = True
+        entry.loads += 1
+        entry.last_error = None
+        entry.load_seconds = time.perf_counter() - start
+        entry.rss_bytes = max(current_rss() - rss_before, 0)
+        entry.loaded_at = time.time()
+        entry.mtimes = _mtimes(entry.paths)
+        return value
+
+    def get(self, name):
+        entry = self._entry(name)
+        if entry.loaded:
+            return entry.value
+        with entry.lock:
+            if not entry.loaded:
+                self._load(entry)
+            return entry.value
+
+    def is_loaded(self, name):
+        return self._entry(name).loaded
+
+    def reload(self, name):
+        """Force a fresh load; the old value keeps serving until the new one is ready."""
+        entry = self._entry(name)
+        with entry.lock:
+            return self._load(entry)
+
+    def changed(self):
+        """Names of loaded artifacts whose watched files changed on disk."""
+        return [
+            e.name for e in list(self._entries.values())
+            if e.loaded and e.paths and _mtimes(e.paths) != e.mtimes
+        ]
+
+    def reload_changed(self):
+        names = self.changed()
+        for name in names:
+            self.reload(name)
+        return names
+
+    def warm_up(self, names):
+        """Load `names` in order, skipping failures; returns {name: error}."""
+        errors = {}
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                errors[name] = e
+        return errors
+
+    def start_warmup(self, names):
+        """Warm `names` up on a daemon thread, at most once per process."""
+        with self._lock:
+            if self._warmup_thread is not None:
+                return self._warmup_thread
+            self._warmup_thread = threading.Thread(
+                target=self.warm_up, args=(list(names),), name="kraya-warmup", daemon=True
+            )
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def start_watcher(self, interval_seconds=5.0):
+        """Reload changed artifacts every `interval_seconds` on a daemon thread (once per process).
+
+        Artifacts reload in registration order, so dependents registered after
+        their inputs see the new versions; the old values serve until then.
+        """
+        def run():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    names = self.reload_changed()
+                except Exception as e:
+                    _log.warning("Hot reload failed: %r", e)
+                    continue
+                if names:
+                    _log.info("Reloaded %s", ", ".join(names))
+                    metrics.inc("hot_reloads_total", len(names))
+
+        with self._lock:
+            if self._watcher_thread is not None:
+                return self._watcher_thread
+            self._watcher_thread = threading.Thread(target=run, name="kraya-reload", daemon=True)
+        self._watcher_thread.start()
+        return self._watcher_thread
+
+    def unload(self, name):
+        entry = self._entry(name)
+        with entry.lock:
+            entry.value = None
+            entry.loaded = False
+
+    def stats(self):
+        return [
+            {
+                "name": e.name,
+                "loaded": e.loaded,
+                "loads": e.loads,
+                "load_seconds": e.load_seconds,
+                "rss_bytes": e.rss_bytes,
+                "loaded_at": e.loaded_at,
+                "paths": list(e.paths),
+                "last_error": repr(e.last_error) if e.last_error else None,
+            }
+            for e in list(self._entries.values())
+        ]
+
+
+registry = ModelRegistry()
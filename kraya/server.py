@@ -0,0 +1,589 @@
+# kraya/server.py
+# Async HTTP/JSON API for the three assistants.
+#
+#   POST /food/classify        {"ingredients": "...", "goal": "Weight Loss", "calories": 120, ...}
+#   POST /fabric/recommend     {"season": "Summer", "skin_tone": "Fair", "weather": "Hot", "work_level": "Low"}
+#   POST /electronics/support  {"device": "Laptop", "query": "screen flickers", "k": 3}
+#   GET  /healthz, GET /stats, GET /metrics (Prometheus text)
+#
+# Uses the same registry artifacts as app.py. Concurrent requests to one
+# route are coalesced by a MicroBatcher (up to `max_batch` requests or
+# `max_wait_ms`) into a single classify_batch / recommend_batch /
+# support_batch call, i.e. one transform+predict or one encode per batch.
+# Only the standard library is needed on top of the model dependencies.
+#
+# With --workers N the parent loads the numpy/sklearn models and maps the
+# electronics index, freezes the GC and forks N workers that accept on one
+# shared socket. The TF-IDF vocabulary and coefficients stay copy-on-write
+# shared; the electronics vectors and .npy artifacts are mmap'd, so they live
+# once in the page cache whatever the worker count. torch is never imported
+# in the parent – a forked torch/OpenMP runtime can deadlock – so each worker
+# loads its own query encoder after the fork, and a stale index is rebuilt in
+# a spawned process before forking.
+import asyncio
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+
+from kraya import metrics, models
+from kraya.electronics import SupportRequest
+from kraya.fabric import ALL_FABRICS, FabricRequest
+from kraya.food import FoodRequest
+from kraya.registry import ModelUnavailable
+from kraya.stats import percentile
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+MAX_BODY_BYTES = 1 << 20
+
+
+class BadRequest(ValueError):
+    status = 400
+
+
+class PayloadTooLarge(BadRequest):
+    status = 413
+
+
+# ---------------- MICRO-BATCHING ---------------- #
+class MicroBatcher:
+    """Coalesce concurrent submit() calls into batched `fn(items) -> results` calls."""
+
+    def __init__(self, fn, max_batch=32, max_wait_ms=5.0, executor=None):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.batches = 0
+        self.items = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, item):
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            items = [item for item, _ in batch]
+            self.batches += 1
+            self.items += len(items)
+            try:
+                # Model calls are blocking; keep the event loop free for I/O
+                outcomes = [(True, r) for r in await loop.run_in_executor(self.executor, self.fn, items)]
+            except Exception as e:
+                if len(items) == 1:
+                    outcomes = [(False, e)]
+                else:
+                    # Retry one by one so only the request that raised fails
+                    outcomes = await loop.run_in_executor(self.executor, self._one_by_one, items)
+            for (_, future), (ok, value) in zip(batch, outcomes):
+                if not future.done():
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+
+    def _one_by_one(self, items):
+        outcomes = []
+        for item in items:
+            try:
+                outcomes.append((True, self.fn([item])[0]))
+            except Exception as e:
+                outcomes.append((False, e))
+        return outcomes
+
+
+# ---------------- LATENCY STATS ---------------- #
+class LatencyStats:
+    def __init__(self, window=10000):
+        self.window = window
+        self.samples = []
+        self.count = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def record(self, seconds, ok=True):
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.samples.append(seconds)
+        if len(self.samples) > self.window:
+            del self.samples[: len(self.samples) - self.window]
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        elapsed = time.perf_counter() - self.started
+        ms = lambda v: round(v * 1000, 3) if v is not None else None
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50_ms": ms(percentile(ordered, 50)),
+            "p99_ms": ms(percentile(ordered, 99)),
+            "throughput_rps": round(self.count / elapsed, 2) if elapsed > 0 else None,
+        }
+
+
+# ---------------- PAYLOADS ---------------- #
+def _parse(cls, payload, required):
+    if not isinstance(payload, dict):
+        raise BadRequest("JSON object expected")
+    missing = [name for name in required if name not in payload]
+    if missing:
+        raise BadRequest(f"Missing field(s): {', '.join(missing)}")
+    names = {f.name for f in fields(cls)}
+    try:
+        return cls(**{k: v for k, v in payload.items() if k in names})
+    except (TypeError, ValueError) as e:
+        raise BadRequest(str(e)) from None
+
+
+def _require_str(req, *names):
+    for name in names:
+        if not isinstance(getattr(req, name), str):
+            raise BadRequest(f"{name} must be a string")
+
+
+def _require_choice(req, name, choices):
+    value = getattr(req, name)
+    if value not in choices:
+        raise BadRequest(f"{name} must be one of {', '.join(choices)} (got {value!r})")
+
+
+def parse_food(payload):
+    req = _parse(FoodRequest, payload, ["ingredients"])
+    _require_str(req, "ingredients", "goal")
+    if not req.ingredients.strip():
+        raise BadRequest("ingredients must not be empty")
+    try:
+        for name in ("calories", "protein", "carbs", "fiber", "fat", "sugar"):
+            setattr(req, name, float(getattr(req, name)))
+    except (TypeError, ValueError):
+        raise BadRequest("nutrition values must be numbers") from None
+    return req
+
+
+def parse_fabric(payload):
+    names = ["season", "skin_tone", "weather", "work_level"]
+    req = _parse(FabricRequest, payload, names)
+    # Accept exactly what the recommender's table answers (UI + trained values)
+    categories = models.get("fabric_recommender").table.categories
+    for name, choices in zip(names, categories):
+        _require_choice(req, name, choices)
+    if req.fabric is not None:
+        _require_choice(req, "fabric", ALL_FABRICS)
+    return req
+
+
+def parse_support(payload):
+    req = _parse(SupportRequest, payload, ["device", "query"])
+    _require_str(req, "device", "query")
+    if not req.query.strip():
+        raise BadRequest("query must not be empty")
+    if isinstance(req.k, bool) or not isinstance(req.k, int) or req.k < 1:
+        raise BadRequest("k must be a positive integer")
+    return req
+
+
+def food_payload(result):
+    return {"label": result.label, "goal": result.goal, "matches_goal": result.matches_goal}
+
+
+def fabric_payload(result):
+    return {"group": result.group, "fabrics": result.fabrics, "fabric": result.fabric,
+            "fabric_ok": result.fabric_ok, "probabilities": result.probabilities}
+
+
+def support_payload(result):
+    return {
+        "confident": result.confident,
+        "score": result.score,
+        "item": result.item,
+        "steps": result.steps,
+        "alternatives": result.alternatives,
+        "source": result.source,
+    }
+
+
+# ---------------- API ---------------- #
+class KrayaAPI:
+    """Transport-independent request handling; used by the HTTP server and InProcessClient."""
+
+    def __init__(self, max_batch=32, max_wait_ms=5.0, workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kraya-batch")
+        batch = lambda fn: MicroBatcher(fn, max_batch, max_wait_ms, self.executor)
+        self.routes = {
+            "/food/classify": (parse_food, food_payload, batch(
+                lambda reqs: models.get("food_classifier").classify_batch(reqs))),
+            "/fabric/recommend": (parse_fabric, fabric_payload, batch(
+                lambda reqs: models.get("fabric_recommender").recommend_batch(reqs))),
+            "/electronics/support": (parse_support, support_payload, batch(
+                lambda reqs: models.get("electronics_retriever").support_batch(reqs))),
+        }
+        self.stats = {path: LatencyStats() for path in self.routes}
+
+    async def warm_up(self, names=("food_classifier", "fabric_recommender", "electronics_retriever")):
+        """Load models before serving; returns {name: error} for the ones that failed."""
+        loop = asyncio.get_running_loop()
+        errors = {}
+        for name in names:
+            try:
+                await loop.run_in_executor(self.executor, models.get, name)
+            except Exception as e:
+                errors[name] = repr(e)
+        return errors
+
+    async def close(self):
+        for _, _, batcher in self.routes.values():
+            await batcher.stop()
+        self.executor.shutdown(wait=False)
+
+    def stats_payload(self):
+        payload = {"caches": {}}
+        if models.registry.is_loaded("food_classifier"):
+            payload["caches"]["food"] = models.get("food_classifier").cache_stats()
+        if models.registry.is_loaded("electronics_retriever"):
+            retriever = models.get("electronics_retriever")
+            payload["caches"]["electronics"] = retriever.cache_stats()
+            payload["electronics_sources"] = retriever.source_stats()
+        for path, (_, _, batcher) in self.routes.items():
+            payload[path] = dict(self.stats[path].summary(), batches=batcher.batches,
+                                 mean_batch=round(batcher.items / batcher.batches, 2) if batcher.batches else None)
+        return payload
+
+    async def handle(self, method, path, body=b""):
+        """Return (status, payload) for one request."""
+        path = path.split("?", 1)[0]
+        if path == "/healthz":
+            return 200, {"status": "ok", "models": {s["name"]: s["loaded"] for s in models.registry.stats()}}
+        if path == "/stats":
+            return 200, self.stats_payload()
+        if path == "/metrics":
+            return 200, metrics.render_prometheus()
+        if path not in self.routes:
+            return 404, {"error": f"No route {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+
+        parse, render, batcher = self.routes[path]
+        start = time.perf_counter()
+        status = 200
+        try:
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise BadRequest("Body is not valid JSON") from None
+            result = await batcher.submit(parse(payload))
+            response = render(result)
+        except BadRequest as e:
+            status, response = e.status, {"error": str(e)}
+        except ModelUnavailable as e:
+            # Model artifact could not be loaded (e.g. fabric_model.pkl missing)
+            status, response = 503, {"error": f"Model unavailable: {e}"}
+        except Exception as e:
+            status, response = 500, {"error": repr(e)}
+        self.stats[path].record(time.perf_counter() - start, ok=status == 200)
+        return status, response
+
+
+class InProcessClient:
+    """Call the API without sockets, e.g. for local tests and benchmarks."""
+
+    def __init__(self, api):
+        self.api = api
+
+    async def post(self, path, payload):
+        return await self.api.handle("POST", path, json.dumps(payload).encode("utf-8"))
+
+    async def get(self, path):
+        return await self.api.handle("GET", path)
+
+
+# ---------------- HTTP TRANSPORT ---------------- #
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise BadRequest("Malformed request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise BadRequest("Invalid Content-Length") from None
+    if length < 0:
+        raise BadRequest("Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise PayloadTooLarge(f"Body larger than {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    return method, target, body, keep_alive
+
+
+def _write_response(writer, status, payload, keep_alive):
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+def make_handler(api):
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except BadRequest as e:
+                    _write_response(writer, e.status, {"error": str(e)}, False)
+                    break
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                status, payload = await api.handle(method, target, body)
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    return handle_connection
+
+
+async def serve(host="127.0.0.1", port=8000, max_batch=32, max_wait_ms=5.0, sock=None):
+    api = KrayaAPI(max_batch=max_batch, max_wait_ms=max_wait_ms)
+    for name, error in (await api.warm_up()).items():
+        print(f"⚠️ {name} not loaded: {error}")
+    # Started here rather than in serve_workers(): threads do not survive fork()
+    models.start_reload_watcher()
+    if sock is not None:
+        server = await asyncio.start_server(make_handler(api), sock=sock)
+    else:
+        server = await asyncio.start_server(make_handler(api), host, port)
+    print(f"Kraya API listening on {', '.join(str(s.getsockname()) for s in server.sockets)}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await api.close()
+
+
+# ---------------- PRE-FORK WORKERS ---------------- #
+def limit_threads(n):
+    """Cap intra-op threads in a worker so N workers don't oversubscribe the cores."""
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(n)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(n)
+
+
+def listen_socket(host, port, backlog=1024):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+def _run_worker(sock, max_batch, max_wait_ms, threads):
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    limit_threads(threads)
+    try:
+        asyncio.run(serve(max_batch=max_batch, max_wait_ms=max_wait_ms, sock=sock))
+    finally:
+        os._exit(0)
+
+
+# Loaded in the parent before forking: none of these touch torch once the
+# persisted index is fresh (see _prepare_index)
+PARENT_PRELOAD = ("fabric_recommender", "food_classifier", "electronics_index")
+
+
+def _prepare_index():
+    # Runs in a spawned process: (re)builds and saves the index if it is stale
+    models.get("electronics_index")
+
+
+def serve_workers(host="127.0.0.1", port=8000, workers=2, max_batch=32, max_wait_ms=5.0, threads=1):
+    """Load the fork-safe models once, then fork `workers` processes sharing them and one socket.
+
+    Dead workers are respawned; SIGINT/SIGTERM stop them all. POSIX only.
+    """
+    from multiprocessing import get_context
+
+    builder = get_context("spawn").Process(target=_prepare_index, name="kraya-index")
+    builder.start()
+    builder.join()
+    preload = PARENT_PRELOAD
+    if builder.exitcode != 0:
+        # Loading the index here would rebuild it, importing torch before the fork;
+        # leave it to the workers instead
+        print(f"⚠️ electronics index could not be prepared (exit code {builder.exitcode}); "
+              f"workers will load it themselves")
+        preload = tuple(name for name in PARENT_PRELOAD if name != "electronics_index")
+    for name, error in models.registry.warm_up(preload).items():
+        print(f"⚠️ {name} not loaded: {error}")
+    if "torch" in sys.modules:
+        # Should not happen; keep the inherited runtime single-threaded if it does
+        print("⚠️ torch was imported before forking; workers run it single-threaded")
+        sys.modules["torch"].set_num_threads(1)
+        threads = 1
+    sock = listen_socket(host, port)
+    # Move everything loaded so far out of the collector's reach, so that GC
+    # passes in the workers don't write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(sock, max_batch, max_wait_ms, threads)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        spawn()
+    print(f"Kraya API pre-forked {workers} workers on {sock.getsockname()} (parent {os.getpid()})")
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print(f"⚠️ worker {pid} exited ({status}); respawning")
+            spawn()
+    sock.close()
+
+
+# ---------------- LOCAL SELF-BENCHMARK ---------------- #
+async def self_benchmark(requests=500, concurrency=32, max_batch=32, max_wait_ms=5.0):
+    """Fire concurrent requests through InProcessClient and return the /stats payload."""
+    from kraya.fabric import SEASONS, SKIN_TONES, WEATHERS, WORK_LEVELS
+
+    api = KrayaAPI(max_batch=max_batch, max_wait_ms=max_wait_ms)
+    await api.warm_up()
+    client = InProcessClient(api)
+    samples = [
+        ("/food/classify", {"ingredients": "oats, honey, banana, milk", "goal": "Weight Loss",
+                            "calories": 210, "protein": 4.8, "carbs": 32.6, "fiber": 5.1, "fat": 5.4, "sugar": 12.3}),
+        ("/fabric/recommend", {"season": SEASONS[0], "skin_tone": SKIN_TONES[0],
+                               "weather": WEATHERS[0], "work_level": WORK_LEVELS[0]}),
+        ("/electronics/support", {"device": "Smartphone", "query": "my phone won't charge"}),
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await client.post(*samples[i % len(samples)])
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    stats = api.stats_payload()
+    await api.close()
+    return stats
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kraya HTTP/JSON API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--self-benchmark", type=int, metavar="N", default=0,
+                        help="run N in-process requests, print p50/p99/throughput and exit")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--metrics", action="store_true", help="enable instrumentation (GET /metrics)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="pre-fork N worker processes sharing one copy of the models")
+    parser.add_argument("--threads", type=int, default=1, help="intra-op threads per pre-forked worker")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+
+    if args.self_benchmark:
+        stats = asyncio.run(self_benchmark(args.self_benchmark, args.concurrency, args.max_batch, args.max_wait_ms))
+        print(json.dumps(stats, indent=2))
+        return 0
+    if args.workers:
+        serve_workers(args.host, args.port, args.workers, args.max_batch, args.max_wait_ms, args.threads)
+        return 0
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
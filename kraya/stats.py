@@ -0,0 +1,33 @@
+# kraya/stats.py
+# Small latency-statistics helpers shared by the server, benchmarks and load tools.
+import os
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted sequence (None if empty)."""
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def summarize(seconds, percentiles=(50, 95, 99)):
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    ordered = sorted(seconds)
+    summary = {"count": len(ordered)}
+    for q in percentiles:
+        value = percentile(ordered, q)
+        summary[f"p{q}_ms"] = round(value * 1000, 3) if value is not None else None
+    summary["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None
+    return summary
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # KiB on Linux, bytes on macOS
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, AttributeError):
+        return 0
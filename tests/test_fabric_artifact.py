@@ -0,0 +1,68 @@
+# tests/test_fabric_artifact.py
+# A fabric artifact holds only the lookup table, with no model to fall back
+# to, so after a round trip it must answer every value the UI offers.
+# Skipped when numpy, pandas or sklearn are not available.
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.path.join(ROOT, "fabric", "fabric_recommendation_dataset.csv")
+
+
+@pytest.fixture(scope="module")
+def model_dict():
+    from kraya.artifacts import train_fabric_model
+
+    return train_fabric_model(CSV_PATH)[0]
+
+
+@pytest.fixture(scope="module")
+def recommender(model_dict, tmp_path_factory):
+    from kraya.artifacts import load_fabric_artifact, save_fabric_artifact
+    from kraya.fabric import FabricTable
+
+    out = str(tmp_path_factory.mktemp("fabric") / "artifact")
+    table = FabricTable.build(model_dict["encoder"], model_dict["model"], model_dict["label"])
+    save_fabric_artifact(out, table)
+    return load_fabric_artifact(out)
+
+
+def test_artifact_has_no_model(recommender):
+    assert recommender.model is None
+
+
+@pytest.mark.parametrize("season", ["Summer", "Winter", "Spring", "Autumn"])
+def test_every_season_is_answered(recommender, season):
+    from kraya.fabric import FABRIC_MAP, SKIN_TONES, WEATHERS, WORK_LEVELS, FabricRequest
+
+    requests = [FabricRequest(season, tone, weather, work)
+                for tone in SKIN_TONES for weather in WEATHERS for work in WORK_LEVELS]
+    results = recommender.recommend_batch(requests)
+    assert [r.group for r in results] == [recommender.table.lookup(q.features())[0] for q in requests]
+    assert all(r.group in FABRIC_MAP and r.probabilities for r in results)
+
+
+def test_table_matches_the_model(model_dict, recommender):
+    from kraya.fabric import FabricRecommender, SEASONS
+
+    live = FabricRecommender(model_dict)
+    rows = [[season, "Fair", "Hot", "Low"] for season in SEASONS + ["Rainy"]]
+    assert [recommender.table.lookup(r)[0] for r in rows] == live.predict_groups(rows)
+
+
+def test_uncovered_table_is_rejected(recommender, tmp_path):
+    from kraya.artifacts import ArtifactError, save_fabric_artifact
+    from kraya.fabric import FabricTable
+
+    table = recommender.table
+    keep = [c for c in table.categories[0] if c not in ("Spring", "Autumn")]
+    rows = [table.categories[0].index(c) for c in keep]
+    proba = table.proba.reshape(len(table.categories[0]), -1, len(table.groups))[rows]
+    partial = FabricTable([keep] + table.categories[1:], table.groups, proba.reshape(-1, len(table.groups)))
+    with pytest.raises(ArtifactError):
+        save_fabric_artifact(str(tmp_path / "artifact"), partial)
@@ -0,0 +1,59 @@
+# tests/test_food_scorer.py
+# The compiled food scorer must agree with sklearn on every dataset row:
+# identical labels, probabilities within 1e-9. Skipped when sklearn or the
+# food model files are not available.
+import csv
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.path.join(ROOT, "food", "food_dataset_realistic.csv")
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    from kraya import models
+    from kraya.registry import ModelUnavailable
+
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # registry paths are relative to the repository root
+    try:
+        sources = (models.FOOD_ARTIFACT_DIR, models.FOOD_BUNDLE_PATH, models.FOOD_MODEL_PATH)
+        if not any(os.path.exists(path) for path in sources):
+            pytest.skip("no food model artifact or pickles")
+        try:
+            return models.get("food_classifier")
+        except ModelUnavailable as e:
+            pytest.skip(f"food model cannot be loaded here: {e}")
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture(scope="module")
+def requests():
+    from kraya.batch_food import row_request
+
+    with open(CSV_PATH, newline="", encoding="utf-8") as f:
+        return [row_request(row) for row in csv.DictReader(f)]
+
+
+def test_scorer_compiles(classifier):
+    from kraya.food import FoodClassifier
+
+    fast = FoodClassifier(classifier.model, classifier.vectorizer, classifier.scaler, fast=True, cache_size=0)
+    assert fast.scorer is not None
+
+
+def test_parity_on_every_row(classifier, requests):
+    from kraya.food_scorer import parity_check
+
+    report = parity_check(classifier, requests, TOLERANCE)
+    assert report["rows"] == len(requests) > 0
+    assert report["label_mismatches"] == []
+    assert report["proba_label_mismatches"] == []
+    assert report["rows_over_tolerance"] == [], f"max |diff| {report['max_abs_proba_diff']:g}"